@@ -7,10 +7,12 @@ Global constants, theme definitions, SettingsStore and StatisticsStore.
 import os
 import time
 import json
-from collections import defaultdict, Counter
+import sqlite3
+from bisect import bisect_right
 from datetime import datetime
-from threading import Thread
-from typing import Any, Dict, List, Optional, Tuple
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from pathlib import Path
 
 # ── Optional audio ────────────────────────────────────────────────────────────
@@ -52,6 +54,14 @@ DEFAULTS: Dict[str, Any] = {
     "accent": "#4f8ef7", "accent2": "#2ecc8f", "danger": "#e05252",
     "warning": "#f0a500", "fg": "#d6dce8", "fg2": "#7a8499", "border": "#2a3045",
     "scan_rate": 15.0, "send_timeout": 15, "file_delay": 0.8,
+    "scan_workers": 4, "scan_timeout": 60.0, "scan_budget": 2.0,
+    "adaptive_scan": True, "scan_rate_min": 1.0, "scan_rate_max": 60.0,
+    "use_inotify": True, "check_completeness": False, "delivery_workers": 2, "queue_size": 200, "drain_on_stop": False,
+    "fanout_deadline": 30.0, "http_pool_size": 10, "http_keep_alive": True,
+    "retry_max_attempts": 5, "retry_base_delay": 5.0,
+    "batch_window": 0.0, "batch_max_files": 10, "batch_max_mb": 25.0,
+    "dedup_window": 0.0, "seen_reconcile_hours": 24.0,
+    "breaker_failures": 5, "breaker_failure_ratio": 0.5, "breaker_cooldown": 60.0,
     "formats": ".jpg,.jpeg,.png,.gif,.bmp,.webp",
     "sound_enabled": True, "sound_volume": 0.8,
     "theme_folder": "",
@@ -148,50 +158,483 @@ class SettingsStore:
 #  STATISTICS STORE
 # ─────────────────────────────────────────────────────────────────────────────
 
+_STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS names (
+    id    INTEGER PRIMARY KEY,
+    kind  TEXT NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (kind, value)
+);
+CREATE TABLE IF NOT EXISTS send_log (
+    id      INTEGER PRIMARY KEY,
+    ts      INTEGER NOT NULL,
+    file    TEXT    NOT NULL,
+    webhook INTEGER NOT NULL,
+    folder  INTEGER NOT NULL,
+    ext     INTEGER NOT NULL,
+    ok      INTEGER NOT NULL,
+    dated   INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS error_log (
+    id      INTEGER PRIMARY KEY,
+    ts      INTEGER NOT NULL,
+    type    INTEGER NOT NULL,
+    file    TEXT    NOT NULL,
+    webhook INTEGER NOT NULL,
+    detail  TEXT    NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counts (
+    dim  TEXT    NOT NULL,
+    key  TEXT    NOT NULL,
+    ok   INTEGER NOT NULL DEFAULT 0,
+    fail INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dim, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup (
+    tier   TEXT    NOT NULL,
+    bucket INTEGER NOT NULL,
+    ok     INTEGER NOT NULL DEFAULT 0,
+    fail   INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tier, bucket)
+) WITHOUT ROWID;
+"""
+
+# Running counters kept in ``counts``: one row per (dimension, key).  Send
+# dimensions count successful and failed sends; "type" counts errors in fail.
+_SEND_DIMS = ("month", "webhook", "folder", "ext")
+
+# Send counts per time bucket (epoch seconds of the bucket's local start) and
+# how long each tier is kept, in seconds (0 = forever)
+_ROLLUP_TIERS: Tuple[Tuple[str, int], ...] = (
+    ("minute", 2 * 86400),
+    ("hour",   14 * 86400),
+    ("day",    400 * 86400),
+    ("month",  0),
+)
+
+# Throughput views: label -> (tier, slots, tier buckets per slot)
+THROUGHPUT_VIEWS: Dict[str, Tuple[str, int, int]] = {
+    "Last hour": ("minute", 12, 5),
+    "24 h":      ("hour",   24, 1),
+    "7 d":       ("day",     7, 1),
+    "12 mo":     ("month",  12, 1),
+}
+
+# The stats writer commits a batch _STATS_LINGER seconds after its first
+# event, or sooner once it holds _STATS_BATCH events or a flush request
+_STATS_LINGER = 0.2
+_STATS_BATCH  = 500
+
+# Longest the UI thread waits for the writer in clear()
+_STATS_FLUSH_WAIT = 5.0
+
+
+def _month(ts_ms: int) -> str:
+    return time.strftime("%Y-%m", time.localtime(ts_ms / 1000))
+
+
+def _bucket_starts(ts: float) -> Tuple[int, int, int, int]:
+    """Local start of the minute, hour, day and month containing *ts* (epoch seconds)."""
+    t = time.localtime(ts)
+    return (int(ts // 60 * 60),
+            int(time.mktime((t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, 0, 0, 0, 0, -1))),
+            int(time.mktime((t.tm_year, t.tm_mon, t.tm_mday, 0, 0, 0, 0, 0, -1))),
+            int(time.mktime((t.tm_year, t.tm_mon, 1, 0, 0, 0, 0, 0, -1))))
+
+
+def _slot_starts(tier: str, slots: int, per_slot: int, now: float) -> List[int]:
+    """Starts of the last *slots* slots of *per_slot* tier buckets, oldest first."""
+    t = time.localtime(now)
+    if tier == "minute":
+        step = 60 * per_slot
+        return [int(now // step * step) - i * step for i in range(slots - 1, -1, -1)]
+    starts = []
+    for i in range(slots - 1, -1, -1):
+        # mktime normalises out-of-range fields, which also handles DST changes
+        if tier == "hour":
+            fields = (t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour - i * per_slot, 0, 0)
+        elif tier == "day":
+            fields = (t.tm_year, t.tm_mon, t.tm_mday - i * per_slot, 0, 0, 0)
+        else:
+            fields = (t.tm_year, t.tm_mon - i * per_slot, 1, 0, 0, 0)
+        starts.append(int(time.mktime(fields + (0, 0, -1))))
+    return starts
+
+
+def _legacy_ts(month: str, clock: str) -> int:
+    """
+    Approximate epoch milliseconds for a legacy record, which only kept its
+    month and time of day: the date is taken to be the 1st of that month.
+    """
+    try:
+        return int(datetime.strptime(f"{month}-01 {clock}", "%Y-%m-%d %H:%M:%S").timestamp() * 1000)
+    except ValueError:
+        return 0
+
+
+class SendRecord(NamedTuple):
+    """One send, as returned by StatisticsStore.recent_sends()."""
+    ts:      int            # epoch milliseconds
+    file:    str
+    webhook: str
+    folder:  str
+    ext:     str
+    ok:      bool
+
+    @property
+    def time(self) -> str:
+        return time.strftime("%H:%M:%S", time.localtime(self.ts / 1000))
+
+
+class ErrorRecord(NamedTuple):
+    """One error, as returned by StatisticsStore.recent_errors()."""
+    ts:      int            # epoch milliseconds
+    type:    str
+    file:    str
+    webhook: str
+    detail:  str
+
+    @property
+    def time(self) -> str:
+        return time.strftime("%H:%M:%S", time.localtime(self.ts / 1000))
+
+
 class StatisticsStore:
+    """
+    Send history and error log in an SQLite database (WAL) next to *path*,
+    so each record is an insert and a crash cannot leave a half-written file
+    behind.  Retention is applied by deleting the oldest rows in one
+    transaction every ``autosave_every`` sends and on save().  A legacy
+    ``wis_stats.json`` at *path* is imported once and renamed; its records
+    only kept a month (sends) or nothing but the time of day (errors), so
+    their imported dates are approximate.
+
+    Rows are stored column-wise compact: an epoch-millisecond timestamp, the
+    file name, and integer codes into the interned ``names`` table for the
+    webhook, folder, extension and error type, which repeat on every row.
+    The code tables are mirrored in memory; nothing else of the history is.
+
+    Send counts are also rolled up per minute, hour, day and month, each tier
+    kept for its own retention (``_ROLLUP_TIERS``), so throughput over the
+    last hour, day, week or year is read from a few dozen rows even after
+    the raw rows have been trimmed.
+
+    Totals per month, webhook, folder, extension and error type are kept as
+    running counters, updated in the same transaction as each record, so the
+    dashboard queries cost O(keys) and cover the whole history, not only the
+    records still within the retention limits.
+
+    All changes go through a queue to a single writer thread, which commits
+    them in batches; callers never block on disk I/O.  Queries run under the
+    same lock as a batch, so they see either all of it or none.  close()
+    commits what is queued with a full sync before the process exits.
+    """
+
     def __init__(self, path: str, config: Dict):
         self._path   = path
         self._config = config
-        self.sends:  List[dict] = []
-        self.errors: List[dict] = []
+        self._lock   = Lock()
+        self._count  = 0
+        self._queue: "Queue[Optional[Tuple[str, Any]]]" = Queue()
+        self._put_lock = Lock()
+        self._closed   = False
+        self._codes:  Dict[Tuple[str, str], int] = {}
+        self._values: Dict[int, str] = {}
+        db_path = os.path.splitext(path)[0] + ".db"
+        try:
+            self._db = self._open(db_path)
+        except sqlite3.Error as e:
+            print(f"Error opening stats database {db_path!r}: {e}")
+            self._db = self._open(":memory:")
+        self._load_names()
+        self._writer = Thread(target=self._write_loop, name="wis-stats", daemon=True)
+        self._writer.start()
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(_STATS_SCHEMA)
+        if db.execute("SELECT 1 FROM counts LIMIT 1").fetchone() is None:
+            StatisticsStore._recount(db)
+        if db.execute("SELECT 1 FROM rollup LIMIT 1").fetchone() is None:
+            StatisticsStore._reroll(db)
+        return db
+
+    @staticmethod
+    def _recount(db: sqlite3.Connection) -> None:
+        """Seed the counters from the raw rows (first run on a database without them)."""
+        db.execute("DELETE FROM counts")
+        db.execute("INSERT INTO counts SELECT 'month', strftime('%Y-%m', ts / 1000, 'unixepoch',"
+                   " 'localtime') AS m, SUM(ok), SUM(1 - ok) FROM send_log GROUP BY m")
+        for dim in _SEND_DIMS[1:]:
+            db.execute(f"INSERT INTO counts SELECT '{dim}', n.value, SUM(s.ok), SUM(1 - s.ok)"
+                       f" FROM send_log s JOIN names n ON n.id = s.{dim} GROUP BY s.{dim}")
+        db.execute("INSERT INTO counts SELECT 'type', n.value, 0, COUNT(*)"
+                   " FROM error_log e JOIN names n ON n.id = e.type GROUP BY e.type")
+
+    @staticmethod
+    def _reroll(db: sqlite3.Connection) -> None:
+        """Seed the time rollups from the raw rows (first run on a database without them)."""
+        local = "ts / 1000, 'unixepoch', 'localtime'"
+        for tier, start in (("minute", "ts / 60000 * 60"),
+                            ("hour",   f"strftime('%Y-%m-%d %H:00:00', {local})"),
+                            ("day",    f"strftime('%Y-%m-%d', {local})"),
+                            ("month",  f"strftime('%Y-%m-01', {local})")):
+            if tier != "minute":
+                start = f"CAST(strftime('%s', {start}, 'utc') AS INTEGER)"
+            # Undated (imported) rows are only right to the month
+            where = "" if tier == "month" else " WHERE dated"
+            db.execute(f"INSERT INTO rollup SELECT '{tier}', {start} AS b, SUM(ok), SUM(1 - ok)"
+                       f" FROM send_log{where} GROUP BY b")
+
+    def _load_names(self) -> None:
+        self._codes  = {}
+        self._values = {}
+        for code, kind, value in self._db.execute("SELECT id, kind, value FROM names"):
+            self._codes[(kind, value)] = code
+            self._values[code] = value
+
+    def _intern(self, kind: str, value: str) -> int:
+        code = self._codes.get((kind, value))
+        if code is None:
+            code = self._db.execute("INSERT INTO names (kind, value) VALUES (?, ?)",
+                                    (kind, value)).lastrowid
+            self._codes[(kind, value)] = code
+            self._values[code] = value
+        return code
+
+    def _bump(self, dim: str, key: str, ok: bool) -> None:
+        self._db.execute(
+            "INSERT INTO counts VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (dim, key) DO UPDATE SET ok = ok + excluded.ok, fail = fail + excluded.fail",
+            (dim, key, int(ok), int(not ok)))
 
     def load(self) -> None:
+        """Queue the import of a legacy JSON history, if any; the database itself needs no loading."""
+        if not os.path.exists(self._path):
+            return
         try:
-            if os.path.exists(self._path):
-                with open(self._path) as f:
-                    data = json.load(f)
-                self.sends  = data.get("sends",  [])
-                self.errors = data.get("errors", [])
+            with open(self._path) as f:
+                data = json.load(f)
         except Exception as e:
-            print(f"Error loading stats: {e}")
+            print(f"Error importing stats: {e}")
+            return
+        self._put(("import", data))
 
     def save(self) -> None:
-        try:
-            max_s = self._config.get("max_sends",  10000)
-            max_e = self._config.get("max_errors",  2000)
-            self.sends  = self.sends [-max(1, max_s):]
-            self.errors = self.errors[-max(1, max_e):]
-            with open(self._path, "w") as f:
-                json.dump({"sends": self.sends, "errors": self.errors}, f)
-        except Exception as e:
-            print(f"Error saving stats: {e}")
+        """Apply the retention limits and checkpoint the write-ahead log (in the background)."""
+        self._put(("trim", None))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything recorded so far is committed. False on timeout."""
+        done = Event()
+        if not self._put(("flush", done)):
+            return True
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Commit the pending records durably and stop the writer; later records are dropped."""
+        if self._put(None):
+            self._writer.join()
 
     def record_send(self, *, ok: bool, file: str, webhook: str, folder: str,
                     ext: str, err_type: str = "", detail: str = "") -> None:
-        ts    = time.strftime("%H:%M:%S")
-        month = time.strftime("%Y-%m")
-        self.sends.append({"time": ts, "month": month, "file": file,
-                           "webhook": webhook, "folder": folder, "ext": ext, "ok": ok})
-        if not ok:
-            self.errors.append({"time": ts, "type": err_type, "file": file,
-                                "webhook": webhook, "detail": detail})
-        every = max(1, self._config.get("autosave_every", 10))
-        if len(self.sends) % every == 0:
-            Thread(target=self.save, daemon=True).start()
+        ts = int(time.time() * 1000)
+        self._put(("send", (ts, file, webhook, folder, ext, ok, err_type, detail)))
+
+    def record_error(self, *, err_type: str, webhook: str, file: str = "", detail: str = "") -> None:
+        """Record an error that is not tied to a single send (e.g. a webhook circuit opening)."""
+        self._put(("error", (int(time.time() * 1000), err_type, file, webhook, detail)))
 
     def clear(self) -> None:
-        self.sends  = []
-        self.errors = []
+        self._put(("clear", None))
+        self.flush(_STATS_FLUSH_WAIT)
+
+    # ── Writer thread ─────────────────────────────────────────────────────────
+
+    def _put(self, event: Optional[Tuple[str, Any]]) -> bool:
+        with self._put_lock:
+            if self._closed:
+                return False
+            self._queue.put(event)
+            if event is None:
+                self._closed = True
+            return True
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + _STATS_LINGER
+            # Collect what arrives shortly after, so a burst of sends is one transaction
+            while batch[-1] is not None and batch[-1][0] != "flush" and len(batch) < _STATS_BATCH:
+                left = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=left) if left > 0
+                                 else self._queue.get_nowait())
+                except Empty:
+                    break
+            closing = batch[-1] is None
+            self._apply([e for e in batch if e is not None], durable=closing)
+            if closing:
+                return
+
+    def _apply(self, batch: List[Tuple[str, Any]], durable: bool = False) -> None:
+        # Flush requests are answered even if the batch fails
+        flushed = [data for kind, data in batch if kind == "flush"]
+        imported = False
+        checkpoint = durable
+        every = self._config.get("autosave_every", 10)
+        with self._lock:
+            try:
+                if durable:
+                    self._db.execute("PRAGMA synchronous=FULL")
+                self._db.execute("BEGIN IMMEDIATE")
+                for kind, data in batch:
+                    if kind == "send":
+                        self._insert_send(*data)
+                        self._count += 1
+                        if every > 0 and self._count % every == 0:
+                            self._trim()
+                    elif kind == "error":
+                        self._insert_error(*data)
+                    elif kind == "trim":
+                        self._trim()
+                        checkpoint = True
+                    elif kind == "clear":
+                        for table in ("send_log", "error_log", "counts", "rollup"):
+                            self._db.execute(f"DELETE FROM {table}")
+                    elif kind == "import":
+                        imported = self._import_safely(data)
+                self._db.execute("COMMIT")
+                if checkpoint:
+                    self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)" if durable
+                                     else "PRAGMA wal_checkpoint(PASSIVE)")
+            except Exception as e:
+                # Drop the batch but keep the writer alive
+                print(f"Error writing stats: {e}")
+                try:
+                    if self._db.in_transaction:
+                        self._db.execute("ROLLBACK")
+                    # Codes interned by the rolled-back batch no longer exist
+                    self._load_names()
+                except sqlite3.Error as e:
+                    print(f"Error rolling back stats: {e}")
+                imported = False
+        if imported:
+            try:
+                os.replace(self._path, self._path + ".imported")
+            except OSError as e:
+                print(f"Error renaming imported stats: {e}")
+        for done in flushed:
+            done.set()
+
+    def _insert_send(self, ts: int, file: str, webhook: str, folder: str, ext: str,
+                     ok: bool, err_type: str, detail: str, legacy: bool = False) -> None:
+        """
+        *legacy* marks an imported record whose timestamp is only right to the
+        month: it is stored undated, feeds only the month rollup, and its
+        error (already in the imported error log) is not logged again.
+        """
+        self._db.execute(
+            "INSERT INTO send_log (ts, file, webhook, folder, ext, ok, dated)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (ts, file, self._intern("webhook", webhook), self._intern("folder", folder),
+             self._intern("ext", ext), int(ok), int(not legacy)))
+        for dim, key in zip(_SEND_DIMS, (_month(ts), webhook, folder, ext)):
+            self._bump(dim, key, ok)
+        for (tier, _), start in zip(_ROLLUP_TIERS, _bucket_starts(ts / 1000)):
+            if legacy and tier != "month":
+                continue
+            self._db.execute(
+                "INSERT INTO rollup VALUES (?, ?, ?, ?) ON CONFLICT (tier, bucket)"
+                " DO UPDATE SET ok = ok + excluded.ok, fail = fail + excluded.fail",
+                (tier, start, int(ok), int(not ok)))
+        if not ok and not legacy:
+            self._insert_error(ts, err_type, file, webhook, detail)
+
+    def _insert_error(self, ts: int, err_type: str, file: str, webhook: str, detail: str) -> None:
+        self._db.execute(
+            "INSERT INTO error_log (ts, type, file, webhook, detail) VALUES (?, ?, ?, ?, ?)",
+            (ts, self._intern("type", err_type), file, self._intern("webhook", webhook), detail))
+        self._bump("type", err_type, False)
+
+    def _import_safely(self, data: Any) -> bool:
+        """Import a legacy history in a savepoint; a malformed file is reported and skipped."""
+        self._db.execute("SAVEPOINT legacy")
+        try:
+            self._import(data)
+        except Exception as e:
+            print(f"Error importing stats: {e}")
+            self._db.execute("ROLLBACK TO legacy")
+            self._db.execute("RELEASE legacy")
+            self._load_names()
+            return False
+        self._db.execute("RELEASE legacy")
+        return True
+
+    def _import(self, data: Any) -> None:
+        if not isinstance(data, dict):
+            raise ValueError("expected a JSON object")
+        # Legacy errors kept only their time of day; they are dated this month
+        this_month = time.strftime("%Y-%m")
+        for e in data.get("errors", []):
+            self._insert_error(_legacy_ts(this_month, e.get("time", "")), e.get("type", ""),
+                               e.get("file", ""), e.get("webhook", ""), e.get("detail", ""))
+        for s in data.get("sends", []):
+            self._insert_send(_legacy_ts(s.get("month", ""), s.get("time", "")), s.get("file", ""),
+                              s.get("webhook", ""), s.get("folder", ""), s.get("ext", ""),
+                              bool(s.get("ok")), "", "", legacy=True)
+        self._trim()
+
+    def _trim(self) -> None:
+        for table, key, default in (("send_log", "max_sends", 10000),
+                                    ("error_log", "max_errors", 2000)):
+            keep = max(1, self._config.get(key, default))
+            self._db.execute(f"DELETE FROM {table} WHERE id <= (SELECT MAX(id) FROM {table}) - ?",
+                             (keep,))
+        now = time.time()
+        for tier, keep in _ROLLUP_TIERS:
+            if keep:
+                self._db.execute("DELETE FROM rollup WHERE tier = ? AND bucket < ?",
+                                 (tier, int(now - keep)))
+
+    # ── Queries ───────────────────────────────────────────────────────────────
+
+    def _query(self, sql: str, args: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def _counts(self, dim: str) -> List[Tuple[str, int, int]]:
+        return self._query("SELECT key, ok, fail FROM counts WHERE dim = ?", (dim,))
+
+    def totals(self) -> Tuple[int, int, int]:
+        """(sends, successful sends, errors) recorded so far."""
+        (ok, fail, errors), = self._query(
+            "SELECT COALESCE(SUM(CASE WHEN dim = 'month' THEN ok END), 0),"
+            "       COALESCE(SUM(CASE WHEN dim = 'month' THEN fail END), 0),"
+            "       COALESCE(SUM(CASE WHEN dim = 'type' THEN fail END), 0)"
+            " FROM counts WHERE dim IN ('month', 'type')")
+        return ok + fail, ok, errors
+
+    def recent_sends(self, n: int) -> List[SendRecord]:
+        """The latest *n* sends, newest first."""
+        with self._lock:
+            rows = self._db.execute("SELECT ts, file, webhook, folder, ext, ok FROM send_log"
+                                    " ORDER BY id DESC LIMIT ?", (n,)).fetchall()
+            v = self._values
+            return [SendRecord(ts, file, v.get(w, ""), v.get(f, ""), v.get(e, ""), bool(ok))
+                    for ts, file, w, f, e, ok in rows]
+
+    def recent_errors(self, n: int) -> List[ErrorRecord]:
+        """The latest *n* errors, newest first."""
+        with self._lock:
+            rows = self._db.execute("SELECT ts, type, file, webhook, detail FROM error_log"
+                                    " ORDER BY id DESC LIMIT ?", (n,)).fetchall()
+            v = self._values
+            return [ErrorRecord(ts, v.get(t, ""), file, v.get(w, ""), detail)
+                    for ts, t, file, w, detail in rows]
 
     def months_data(self, n: int) -> List[Tuple[str, int]]:
         now = datetime.now()
@@ -203,35 +646,33 @@ class StatisticsStore:
                 m += 12
                 y -= 1
             slots.append((f"{y}-{m:02d}", datetime(y, m, 1).strftime("%b %y")))
-        month_counts: Counter = Counter(s.get("month") for s in self.sends)
+        month_counts = {key: ok + fail for key, ok, fail in self._counts("month")}
         return [(label, month_counts.get(key, 0)) for key, label in slots]
 
-    def _count_by(self, field: str, source: Optional[List[dict]] = None,
-                  ok_only: bool = True) -> List[Tuple[str, int]]:
-        data = source if source is not None else self.sends
-        counts: Dict[str, int] = defaultdict(int)
-        for item in data:
-            if ok_only and not item.get("ok"):
-                continue
-            counts[item.get(field, "Unknown")] += 1
-        return sorted(counts.items(), key=lambda x: -x[1])
+    def throughput(self, view: str) -> List[Tuple[str, int]]:
+        """Sends per slot for one of THROUGHPUT_VIEWS, oldest slot first."""
+        tier, slots, per_slot = THROUGHPUT_VIEWS[view]
+        starts = _slot_starts(tier, slots, per_slot, time.time())
+        counts = [0] * slots
+        for bucket, n in self._query("SELECT bucket, ok + fail FROM rollup"
+                                     " WHERE tier = ? AND bucket >= ?", (tier, starts[0])):
+            counts[bisect_right(starts, bucket) - 1] += n
+        fmt = {"minute": "%H:%M", "hour": "%H:00", "day": "%a %d", "month": "%b %y"}[tier]
+        return [(time.strftime(fmt, time.localtime(start)), n) for start, n in zip(starts, counts)]
+
+    def _count_by(self, dim: str, ok_only: bool = True) -> List[Tuple[str, int]]:
+        counts = [(key, ok if ok_only else ok + fail) for key, ok, fail in self._counts(dim)]
+        return sorted((c for c in counts if c[1]), key=lambda x: -x[1])
 
     def webhook_data(self)    -> List[Tuple[str, int]]: return self._count_by("webhook")
     def folder_data(self)     -> List[Tuple[str, int]]: return self._count_by("folder")
     def ext_data(self)        -> List[Tuple[str, int]]: return self._count_by("ext")
     def error_type_data(self) -> List[Tuple[str, int]]:
-        return self._count_by("type", source=self.errors, ok_only=False)
+        return self._count_by("type", ok_only=False)
 
     def webhook_table(self) -> List[Tuple]:
-        wh: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
-        for s in self.sends:
-            rec = wh[s.get("webhook", "Unknown")]
-            if s.get("ok"):
-                rec[0] += 1
-            else:
-                rec[1] += 1
         rows = []
-        for name, (ok, fail) in sorted(wh.items(), key=lambda x: -x[1][0]):
+        for name, ok, fail in sorted(self._counts("webhook"), key=lambda x: -x[1]):
             tot  = ok + fail
             rate = f"{100 * ok / tot:.1f}%" if tot else "—"
             rows.append((name, ok, fail, rate))
@@ -5,6 +5,10 @@ Abstract base classes (interfaces) for pluggable components.
 """
 
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from services.payload import UploadPayload
 
 
 class ISender(ABC):
@@ -12,6 +16,27 @@ class ISender(ABC):
     def send(self, file_path: str, url: str, timeout: int,
              username: str = "", avatar_url: str = "") -> bool: ...
 
+    def send_payload(self, payload: "UploadPayload", url: str, timeout: int,
+                     username: str = "", avatar_url: str = "") -> bool:
+        """Send an already-read file. Senders that can share the buffer should override."""
+        return self.send(payload.path, url, timeout, username, avatar_url)
+
+    def send_batch(self, payloads: List["UploadPayload"], url: str, timeout: int,
+                   username: str = "", avatar_url: str = "") -> bool:
+        """Send several files in one message. The default sends them one by one."""
+        return all([self.send_payload(p, url, timeout, username, avatar_url) for p in payloads])
+
+    def open(self, urls: Iterable[str], timeout: int,
+             pool_size: Optional[int] = None, keep_alive: Optional[bool] = None) -> None:
+        """Prepare for a monitoring session (e.g. pre-warm connections). Optional."""
+
+    def close(self) -> None:
+        """Release resources held since open(). Optional."""
+
+    def throttle_state(self) -> Dict[str, float]:
+        """Seconds until each currently rate-limited webhook URL may send again."""
+        return {}
+
 
 class IAudioPlayer(ABC):
     @abstractmethod
@@ -22,8 +22,10 @@ def main():
     sender = HttpSender()
     audio  = PygameAudioPlayer() if _PYGAME_OK else NullAudioPlayer()
     root   = tk.Tk()
-    WIS(root, sender=sender, audio=audio, store=store, stats=stats)
+    WIS(root, sender=sender, audio=audio, store=store, stats=stats,
+        state_path=os.path.join(base, "wis_state.db"))
     root.mainloop()
+    stats.close()
 
 
 if __name__ == "__main__":
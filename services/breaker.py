@@ -0,0 +1,119 @@
+"""
+services/breaker.py
+-------------------
+CircuitBreaker: per-webhook closed / open / half-open failure tracking.
+"""
+
+import time
+from collections import deque
+from threading import Lock
+from typing import Deque, Dict, Optional, Tuple
+
+CLOSED    = "closed"
+OPEN      = "open"
+HALF_OPEN = "half-open"
+
+# Recent results kept per webhook for the failure-ratio rule, and how many of
+# them are needed before the ratio is trusted
+_WINDOW      = 20
+_MIN_SAMPLES = 10
+
+# Shortest wait given to other sends while a half-open probe is in flight
+# (normally they wait out the cooldown counted from the probe's start)
+_PROBE_WAIT = 1.0
+
+
+class _Circuit:
+    def __init__(self):
+        self.state     = CLOSED
+        self.failures  = 0
+        self.results: Deque[bool] = deque(maxlen=_WINDOW)
+        self.opened_at = 0.0
+        self.probing   = False
+        self.probe_at  = 0.0
+
+
+class CircuitBreaker:
+    """
+    A webhook's circuit opens after ``failures`` consecutive failed sends, or
+    once the share of failures among its recent sends reaches ``ratio``.
+    While open, sends are refused until ``cooldown`` seconds have passed; then
+    a single probe is let through (half-open) and its result closes or
+    re-opens the circuit.  ``failures=0`` disables the breaker.
+    """
+
+    def __init__(self, failures: int = 5, ratio: float = 0.5, cooldown: float = 60.0):
+        self._failures = max(0, failures)
+        self._ratio    = ratio
+        self._cooldown = max(1.0, cooldown)
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = Lock()
+
+    def allow(self, key: str) -> float:
+        """0 if a send to *key* may go ahead now, else the seconds to wait before trying again."""
+        if not self._failures:
+            return 0.0
+        with self._lock:
+            c = self._circuits.get(key)
+            if c is None or c.state == CLOSED:
+                return 0.0
+            if c.state == OPEN:
+                left = c.opened_at + self._cooldown - time.monotonic()
+                if left > 0:
+                    return left
+                c.state = HALF_OPEN
+            now = time.monotonic()
+            if c.probing:
+                # If the probe fails, the next one is a full cooldown away
+                return max(_PROBE_WAIT, c.probe_at + self._cooldown - now)
+            c.probing  = True
+            c.probe_at = now
+            return 0.0
+
+    def record(self, key: str, ok: bool) -> Optional[str]:
+        """Feed a send result. Returns the new state when the circuit changed state."""
+        if not self._failures:
+            return None
+        with self._lock:
+            c = self._circuits.setdefault(key, _Circuit())
+            c.results.append(ok)
+            if c.state == HALF_OPEN:
+                c.probing = False
+                if ok:
+                    c.state    = CLOSED
+                    c.failures = 0
+                    c.results.clear()
+                    return CLOSED
+                return self._trip(c)
+            if ok:
+                c.failures = 0
+                return None
+            c.failures += 1
+            if c.state == CLOSED and (c.failures >= self._failures or self._ratio_tripped(c)):
+                return self._trip(c)
+            return None
+
+    def release(self, key: str) -> None:
+        """A send let through by allow() ended without a verdict (e.g. rate limited)."""
+        with self._lock:
+            c = self._circuits.get(key)
+            if c is not None:
+                c.probing = False
+
+    def _ratio_tripped(self, c: _Circuit) -> bool:
+        if self._ratio <= 0 or len(c.results) < _MIN_SAMPLES:
+            return False
+        return c.results.count(False) / len(c.results) >= self._ratio
+
+    def _trip(self, c: _Circuit) -> str:
+        c.state     = OPEN
+        c.opened_at = time.monotonic()
+        return OPEN
+
+    def snapshot(self) -> Dict[str, Tuple[str, float]]:
+        """(state, seconds until the next probe) for every circuit that is not closed."""
+        now = time.monotonic()
+        with self._lock:
+            return {key: (c.state, max(0.0, c.opened_at + self._cooldown - now)
+                          if c.state == OPEN else 0.0)
+                    for key, c in self._circuits.items() if c.state != CLOSED}
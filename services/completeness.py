@@ -0,0 +1,52 @@
+"""
+services/completeness.py
+------------------------
+Container-level completeness checks for image files that may still be written.
+"""
+
+import struct
+from typing import Optional
+
+_PNG_SIG   = b"\x89PNG\r\n\x1a\n"
+_PNG_IEND  = b"\x00\x00\x00\x00IEND\xaeB`\x82"
+_JPEG_SOI  = b"\xff\xd8"
+_JPEG_EOI  = b"\xff\xd9"
+_TAIL      = 64
+
+
+def is_complete(path: str, size: int) -> Optional[bool]:
+    """
+    Judge from the header and the last bytes whether the file's container is
+    complete: PNG ends with IEND, JPEG with EOI (FFD9), GIF with the 0x3B
+    trailer, RIFF (WebP) and BMP declare a length matching *size*.
+
+    Returns None for formats it cannot judge (or unreadable files), so the
+    caller falls back to its time-based settle check.
+    """
+    try:
+        with open(path, "rb") as fh:
+            head = fh.read(16)
+            if size > _TAIL:
+                fh.seek(size - _TAIL)
+            else:
+                fh.seek(0)
+            tail = fh.read(_TAIL)
+    except OSError:
+        return None
+    if len(head) < 12:
+        return False if size else None
+    if head.startswith(_PNG_SIG):
+        return tail.endswith(_PNG_IEND)
+    if head.startswith(_JPEG_SOI):
+        # Some encoders pad the file after the EOI marker
+        return tail.rstrip(b"\x00").endswith(_JPEG_EOI)
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return tail.endswith(b";")
+    if head[:4] == b"RIFF":
+        declared = struct.unpack("<I", head[4:8])[0] + 8
+        # A trailing pad byte after an odd-sized chunk is allowed
+        return size >= declared
+    if head[:2] == b"BM":
+        declared = struct.unpack("<I", head[2:6])[0]
+        return None if declared == 0 else size >= declared
+    return None
@@ -0,0 +1,103 @@
+"""
+services/dedup.py
+-----------------
+ContentIndex: content hashes of sent files, used to skip re-sending copies.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from threading import Lock
+from typing import Optional
+
+from services.seen_index import open_state_db
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hash_cache (
+    dev       INTEGER NOT NULL,
+    ino       INTEGER NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    digest    BLOB    NOT NULL,
+    cached_at REAL    NOT NULL,
+    PRIMARY KEY (dev, ino)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sent_hash (
+    digest     BLOB PRIMARY KEY,
+    path       TEXT NOT NULL,
+    first_sent REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sent_hash_age ON sent_hash (first_sent);
+"""
+
+# Rows kept in each table; the oldest are trimmed every _TRIM_EVERY writes
+_MAX_ROWS   = 100_000
+_TRIM_EVERY = 1000
+
+
+class ContentIndex:
+    """
+    BLAKE2b digests are cached per (st_dev, st_ino) and reused while the
+    file's size and mtime are unchanged.  ``sent_hash`` remembers the first
+    file sent with each digest, so later copies within the dedup window can
+    be skipped.
+    """
+
+    def __init__(self, path: str):
+        self._lock   = Lock()
+        self._writes = 0
+        try:
+            self._db = open_state_db(path)
+        except sqlite3.Error as e:
+            print(f"Error opening content index {path!r}: {e}")
+            self._db = open_state_db("")
+        self._db.executescript(_SCHEMA)
+
+    def digest(self, path: str, data: memoryview) -> Optional[bytes]:
+        """Digest of *path*, whose contents are *data*; None if the file is gone."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, digest FROM hash_cache WHERE dev = ? AND ino = ?",
+                (st.st_dev, st.st_ino)).fetchone()
+        if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return bytes(row[2])
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO hash_cache VALUES (?, ?, ?, ?, ?, ?)",
+                             (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, digest, time.time()))
+            self._wrote()
+        return digest
+
+    def first_sent(self, digest: bytes, window: float) -> Optional[str]:
+        """Path of the file first sent with *digest* within the last *window* seconds."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT path FROM sent_hash WHERE digest = ? AND first_sent >= ?",
+                (digest, time.time() - window)).fetchone()
+        return row[0] if row else None
+
+    def mark_sent(self, digest: bytes, path: str, window: float) -> None:
+        """Remember *path* as the first send of *digest*, unless one is still within the window."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO sent_hash VALUES (?, ?, ?)"
+                " ON CONFLICT (digest) DO UPDATE SET path = excluded.path, first_sent = excluded.first_sent"
+                " WHERE first_sent < ?",
+                (digest, path, now, now - window))
+            self._wrote()
+
+    def _wrote(self) -> None:
+        self._writes += 1
+        if self._writes % _TRIM_EVERY:
+            return
+        for table, age in (("hash_cache", "cached_at"), ("sent_hash", "first_sent")):
+            self._db.execute(
+                f"DELETE FROM {table} WHERE {age} <= (SELECT {age} FROM {table}"
+                f" ORDER BY {age} DESC LIMIT 1 OFFSET ?)", (_MAX_ROWS,))
@@ -1,27 +1,165 @@
 """
 services/monitor.py
 -------------------
-MonitoringService: the background thread that scans folders and sends images.
+MonitoringService: the background thread that watches/scans folders and sends images.
 """
 
 import os
 import time
-from threading import Thread
-from typing import Callable, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from queue import Empty, Full, Queue, SimpleQueue
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 import requests
 
 from core.config import DEFAULTS, _SCRIPT_DIR
 from core.events import ISender, IAudioPlayer
 from core.config import StatisticsStore
+from services.breaker import OPEN, CircuitBreaker
+from services.dedup import ContentIndex
+from services.outbox import Outbox, OutboxJob, backoff_delay
+from services.payload import UploadPayload
+from services.completeness import is_complete
+from services.readiness import ReadinessTracker
+from services.ratelimit import RateLimitedError
 from services.scanner import FolderScanner
+from services.seen_index import SeenIndex
+from services.watcher import InotifyWatcher
 
 
 _SEND_ERRORS: Tuple = (
     (requests.exceptions.Timeout,        "Timeout",          "Timeout"),
     (requests.exceptions.ConnectionError, "Connection error", "Connection Error"),
+    (requests.exceptions.HTTPError,       "Server error",     "Server Error"),
 )
 
+# Failures worth retrying later through the outbox; anything else is final.
+# A missed deadline is not retried: the abandoned request is still running and
+# may yet succeed, and a retry would post the image twice.
+_RETRYABLE = frozenset({"Timeout", "Connection Error", "Server Error"})
+
+
+class _Outcome(NamedTuple):
+    """Result of one webhook send, logged as "<label>  file  →  webhook[: note]"."""
+    ok:       bool
+    label:    str = ""
+    err_type: str = ""
+    detail:   str = ""
+    note:     str = ""
+    retry_after: float = 0.0
+
+
+class _Job(NamedTuple):
+    """A queued delivery: a new file for every webhook, or an outbox retry for one."""
+    fc:      dict
+    path:    str
+    webhook: Optional[dict]      = None
+    outbox:  Optional[OutboxJob] = None
+
+
+# Upper bound on how long the loop blocks waiting for inotify events, so that
+# stop() is honoured promptly even when the watched folders are idle.
+_WATCH_TICK = 0.5
+
+# Settle window for files inotify reported closed: short, but long enough that
+# a writer reopening the file (or a create-then-fill tool) is waited for
+_CLOSED_SETTLE = 0.3
+
+# Discord accepts at most this many attachments per webhook message
+_MAX_ATTACHMENTS = 10
+
+
+class _FolderPoll:
+    """
+    Scan schedule and timing of one folder; written by its scan thread, read
+    by the loop.  With adaptive scanning the interval drops to the minimum
+    after a scan that found files and doubles after each idle scan, up to the
+    maximum.  A folder with its own scan rate keeps it fixed.
+    """
+
+    def __init__(self, fc: dict, s: "_Session", periodic: bool):
+        self.fc       = fc
+        self.periodic = periodic
+        self.adaptive = s.adaptive and not fc.get("scan_rate")
+        self.interval = float(fc.get("scan_rate") or s.scan_rate)
+        # The bounds always include the configured scan rate
+        self.min_interval = min(s.scan_rate_min, self.interval)
+        self.max_interval = max(s.scan_rate_max, self.interval)
+        self.timeout  = float(fc.get("scan_timeout") or s.scan_timeout)
+        self.budget   = s.scan_budget
+        self.next_at  = 0.0
+        self.future: Optional[Future] = None
+        self.started  = 0.0
+        self.finished = 0.0
+        self.duration = 0.0
+        self.scans    = 0
+        self.overdue  = False
+
+    def adapt(self, found: int, finished: bool) -> None:
+        # An unfinished pass does not count as idle, so a huge tree keeps its pace
+        if self.adaptive and (found or finished):
+            self.interval = (self.min_interval if found
+                             else min(self.max_interval, self.interval * 2))
+
+
+class _Session:
+    """Per-start() state shared by the monitor thread and the delivery workers."""
+
+    def __init__(self, folders: list, webhooks: list, settings: dict, debug: bool,
+                 scanner: FolderScanner, formats: set):
+        self.folders    = folders
+        self.webhooks   = webhooks
+        self.debug      = debug
+        self.scanner    = scanner
+        self.formats    = formats
+        self.scan_rate  = float(settings.get("scan_rate",  1.0))
+        self.scan_timeout = float(settings.get("scan_timeout", 60.0))
+        self.scan_budget  = float(settings.get("scan_budget", 2.0))
+        self.scan_workers = max(1, int(float(settings.get("scan_workers", 4))))
+        self.adaptive      = bool(settings.get("adaptive_scan", True))
+        self.scan_rate_min = max(0.1, float(settings.get("scan_rate_min", 1.0)))
+        self.scan_rate_max = float(settings.get("scan_rate_max", 60.0))
+        self.file_delay = float(settings.get("file_delay", 0.8))
+        self.timeout    = int(settings.get("send_timeout", 30))
+        self.volume     = float(settings.get("sound_volume", 0.8))
+        self.use_inotify = bool(settings.get("use_inotify", True))
+        self.workers    = max(1, int(float(settings.get("delivery_workers", 2))))
+        self.drain      = bool(settings.get("drain_on_stop", False))
+        self.deadline   = float(settings.get("fanout_deadline", 30.0))
+        self.fanout: Optional[ThreadPoolExecutor] = None
+        if len(webhooks) > 1:
+            self.fanout = ThreadPoolExecutor(max_workers=self.workers * len(webhooks),
+                                             thread_name_prefix="wis-fanout")
+        self.active_workers = self.workers
+        self.queue: Queue = Queue(maxsize=max(1, int(float(settings.get("queue_size", 200)))))
+        # Files a worker could not deliver yet, handed back to the scanner stage
+        self.retry: SimpleQueue = SimpleQueue()
+        # Scanned files waiting to stop changing before they are queued
+        self.settling = ReadinessTracker(
+            self.file_delay, is_complete if settings.get("check_completeness", False) else None)
+        self.batch_window = float(settings.get("batch_window", 0.0))
+        self.batch_files  = min(_MAX_ATTACHMENTS, max(1, int(float(settings.get("batch_max_files", 10)))))
+        self.batch_bytes  = int(float(settings.get("batch_max_mb", 25.0)) * 1024 * 1024)
+        # Hours in the settings, seconds here
+        self.dedup_window = float(settings.get("dedup_window", 0.0)) * 3600
+        self.max_attempts = max(1, int(float(settings.get("retry_max_attempts", 5))))
+        self.retry_base   = float(settings.get("retry_base_delay", 5.0))
+        # Hours in the settings, seconds here; 0 disables the pruning pass
+        self.reconcile_every = float(settings.get("seen_reconcile_hours", 24.0)) * 3600
+        self.by_url    = {wh.get("url", ""): wh for wh in webhooks}
+        self.by_folder = {fc["path"]: fc for fc in folders}
+        # Outbox job ids currently sitting in the queue or being delivered
+        self.claimed: set = set()
+        # Content digest -> path of the copy currently being delivered
+        self.sending: Dict[bytes, str] = {}
+        self.inflight: set = set()
+        self.lock = Lock()
+        self.stop = Event()
+        # Cuts the loop's idle wait short (scan finished, stop requested)
+        self.wake = Event()
+        self.watcher: Optional[InotifyWatcher] = None
+
 
 class MonitoringService:
     def __init__(self,
@@ -29,16 +167,24 @@ class MonitoringService:
                  audio:       IAudioPlayer,
                  stats:       StatisticsStore,
                  on_log:      Callable[[str, str], None],
-                 on_counters: Callable[[int, int], None]):
+                 on_counters: Callable[[int, int], None],
+                 state_path:  str = ""):
         self._sender      = sender
         self._audio       = audio
         self._stats       = stats
         self._on_log      = on_log
         self._on_counters = on_counters
         self._running     = False
-        self._sent_files: set = set()
+        self._session: Optional[_Session] = None
+        self._seen        = SeenIndex(state_path)
+        self._outbox      = Outbox(state_path)
+        self._hashes      = ContentIndex(state_path)
+        self._breaker     = CircuitBreaker()
+        self._count_lock  = Lock()
         self._sent_count  = 0
         self._fail_count  = 0
+        # Files with sends still in the outbox: path -> every settled send so far was ok
+        self._partial: Dict[str, bool] = {}
 
     @property
     def running(self) -> bool:
@@ -46,111 +192,662 @@ class MonitoringService:
 
     def start(self, folders: list, webhooks: list, settings: dict, debug: bool) -> None:
         self._running    = True
-        self._sent_count = 0
-        self._fail_count = 0
-        self._sent_files.clear()
-        scanner = FolderScanner(self._formats(settings))
-        self._snapshot(folders, scanner)
-        Thread(target=self._loop,
-               args=(folders, webhooks, settings, debug, scanner),
-               daemon=True).start()
+        with self._count_lock:
+            self._sent_count = 0
+            self._fail_count = 0
+            self._partial.clear()
+        formats = self._formats(settings)
+        session = _Session(folders, webhooks, settings, debug, FolderScanner(formats), formats)
+        self._session = session
+        self._breaker = CircuitBreaker(
+            failures=int(float(settings.get("breaker_failures", 5))),
+            ratio=float(settings.get("breaker_failure_ratio", 0.5)),
+            cooldown=float(settings.get("breaker_cooldown", 60.0)))
+        self._sender.open([wh.get("url", "") for wh in webhooks], session.timeout,
+                          pool_size=int(float(settings.get("http_pool_size", 10))),
+                          keep_alive=bool(settings.get("http_keep_alive", True)))
+        Thread(target=self._loop, args=(session,), daemon=True).start()
+        for i in range(session.workers):
+            Thread(target=self._deliver_loop, args=(session,),
+                   name=f"wis-deliver-{i}", daemon=True).start()
 
     def stop(self) -> None:
         self._running = False
+        session, self._session = self._session, None
+        if session is None:
+            return
+        session.stop.set()
+        self._wake(session)
+        pending = session.queue.qsize()
+        if pending and session.drain:
+            self._on_log(f"Finishing {pending} queued file(s) in the background", "info")
+        waiting = self._outbox.pending()
+        if waiting:
+            self._on_log(f"{waiting} delivery job(s) kept in the outbox for the next start", "info")
+
+    def breaker_state(self) -> Dict[str, Tuple[str, float]]:
+        """Webhook URL -> (circuit state, seconds until the next probe) for circuits not closed."""
+        return self._breaker.snapshot()
 
     @staticmethod
     def _formats(settings: dict) -> set:
         raw = settings.get("formats", DEFAULTS["formats"])
         return {e.strip().lower() for e in raw.split(",") if e.strip()}
 
-    def _snapshot(self, folders: list, scanner: FolderScanner) -> None:
-        new_files = {
-            os.path.abspath(fp)
-            for fc in folders
-            for fp in scanner.iter_images(fc["path"], fc.get("recursive", False))
-        }
-        self._sent_files.update(new_files)
-        self._on_log(f"Snapshot: {len(new_files)} existing file(s) marked as seen", "debug")
-
-    def _loop(self, folders, webhooks, settings, debug, scanner: FolderScanner) -> None:
-        scan_rate  = float(settings.get("scan_rate",  1.0))
-        file_delay = float(settings.get("file_delay", 0.8))
-        timeout    = int(settings.get("send_timeout", 30))
-        volume     = float(settings.get("sound_volume", 0.8))
-        scan = 0
-        while self._running:
-            scan += 1
-            if debug:
-                self._on_log(f"Scan #{scan}", "debug")
-            for fc in folders:
-                try:
-                    self._scan_folder(fc, webhooks, scanner, file_delay, timeout, volume)
-                except Exception as e:
-                    self._on_log(f"Error scanning {fc['path']}: {e}", "err")
-            time.sleep(scan_rate)
-
-    def _scan_folder(self, fc, webhooks, scanner, file_delay, timeout, volume) -> None:
-        folder_path = fc["path"]
-        recursive   = fc.get("recursive", False)
-        base_name   = os.path.basename(folder_path)
-        for fp in scanner.iter_images(folder_path, recursive):
-            abs_fp = os.path.abspath(fp)
-            if abs_fp in self._sent_files:
+    def _snapshot(self, fc: dict, scanner: FolderScanner, formats: set) -> None:
+        """
+        Mark a folder's existing files as seen, once; later runs resume from
+        the index.  When the folder's scope (recursive flag, formats) has
+        grown since, only the files it newly covers are recorded.
+        """
+        root      = os.path.abspath(fc["path"])
+        recursive = bool(fc.get("recursive", False))
+        scope     = self._seen.primed_scope(root)
+        if scope is None:
+            n = self._seen.add_many(
+                os.path.abspath(fp) for fp in scanner.iter_images(fc["path"], recursive))
+        elif scope == (recursive, frozenset(formats)):
+            return
+        else:
+            was_recursive, old_formats = scope
+            new_formats = formats - old_formats
+            # A separate scanner, so the session's directory cache does not hide
+            # files that arrived in the old scope while WIS was closed
+            covered = (os.path.abspath(fp)
+                       for fp in FolderScanner(formats).iter_images(fc["path"], recursive))
+            n = self._seen.add_many(
+                (fp for fp in covered
+                 if os.path.splitext(fp)[1].lower() in new_formats
+                 or (not was_recursive and os.path.dirname(fp) != root)),
+                keep_existing=True)
+        self._seen.mark_primed(root, recursive, formats)
+        if n or scope is None:
+            self._on_log(f"Snapshot: {n} existing file(s) in {fc['path']} marked as seen", "debug")
+
+    def _reconcile(self, s: _Session) -> None:
+        """Evict seen-index records of deleted files under the folders that are reachable now."""
+        roots = [os.path.abspath(fc["path"]) for fc in s.folders if os.path.isdir(fc["path"])]
+        try:
+            n = self._seen.reconcile(roots, s.stop)
+        except Exception as e:
+            self._on_log(f"Error pruning seen index: {e}", "err")
+            return
+        if n or s.debug:
+            self._on_log(f"Seen index: pruned {n} deleted file(s)", "debug")
+        if s.debug:
+            self._on_log(f"Seen index: {self._seen.memory_report()}", "debug")
+
+    def _open_watcher(self, folders: list, use_inotify: bool) -> Tuple[Optional[InotifyWatcher], list]:
+        """Set up inotify watches; returns the watcher and the folders that must be polled."""
+        if not use_inotify or not InotifyWatcher.available():
+            return None, list(folders)
+        try:
+            watcher = InotifyWatcher()
+        except OSError as e:
+            self._on_log(f"inotify unavailable ({e}), falling back to polling", "warn")
+            return None, list(folders)
+        polled = []
+        for fc in folders:
+            try:
+                watcher.add_tree(fc["path"], fc.get("recursive", False))
+            except OSError as e:
+                self._on_log(f"Cannot watch {fc['path']} ({e.strerror or e}), polling instead", "warn")
+                polled.append(fc)
+        if len(polled) == len(folders):
+            watcher.close()
+            return None, polled
+        self._on_log(f"inotify: {watcher.watch_count} watch(es) on "
+                     f"{len(folders) - len(polled)} folder(s)", "debug")
+        return watcher, polled
+
+    # ── Detection stage (monitor thread) ──────────────────────────────────────
+
+    def _loop(self, s: _Session) -> None:
+        # Reads every stored path, so it runs here rather than on the UI thread
+        self._seen.load_hashes()
+        waiting = self._outbox.pending()
+        if waiting:
+            self._on_log(f"Outbox: {waiting} delivery job(s) pending retry", "info")
+        pool = ThreadPoolExecutor(max_workers=min(s.scan_workers, len(s.folders)) or 1,
+                                  thread_name_prefix="wis-scan")
+        for fut in [pool.submit(self._snapshot, fc, s.scanner, s.formats) for fc in s.folders]:
+            try:
+                fut.result()
+            except Exception as e:
+                self._on_log(f"Error taking snapshot: {e}", "err")
+        if s.debug:
+            self._on_log(f"Seen index: {self._seen.memory_report()}", "debug")
+        watcher, polled = self._open_watcher(s.folders, s.use_inotify)
+        s.watcher = watcher
+        by_root = {os.path.abspath(fc["path"]): fc for fc in s.folders}
+        # Watched folders get one catch-up scan for files that landed while nothing
+        # was watching (offline, or before the watches); polled ones are scanned periodically
+        polls = {os.path.abspath(fc["path"]): _FolderPoll(fc, s, periodic=fc in polled)
+                 for fc in s.folders}
+        next_prune = time.monotonic() + s.reconcile_every
+        try:
+            while not s.stop.is_set():
+                if s.reconcile_every > 0 and time.monotonic() >= next_prune:
+                    Thread(target=self._reconcile, args=(s,), name="wis-reconcile", daemon=True).start()
+                    next_prune = time.monotonic() + s.reconcile_every
+                while not s.retry.empty():
+                    fc, fp = s.retry.get()
+                    s.scanner.requeue(fc["path"], fp)
+                    p = polls.get(os.path.abspath(fc["path"]))
+                    # A watched folder is not polled: scan it again for the handed-back file
+                    if p is not None and not p.periodic and p.future is None:
+                        p.next_at = min(p.next_at, time.monotonic() + p.interval)
+                self._release_due(s)
+                self._schedule_scans(s, polls.values(), pool)
+                self._release_settled(s)
+                now  = time.monotonic()
+                wait = min([_WATCH_TICK] + [max(0.0, p.next_at - now)
+                                            for p in polls.values() if p.future is None])
+                settle = s.settling.next_check()
+                if settle is not None:
+                    wait = min(wait, settle)
+                if watcher is None:
+                    s.wake.wait(wait)
+                    s.wake.clear()
+                    continue
+                for root, fp in watcher.read(wait):
+                    fc = by_root.get(root)
+                    if fc is None or not s.scanner.matches(fp):
+                        continue
+                    # IN_CLOSE_WRITE / IN_MOVED_TO: the writer has let go, so a short
+                    # settle window replaces the full file delay
+                    self._enqueue(s, fc, fp, window=min(s.file_delay, _CLOSED_SETTLE))
+                if watcher.overflowed:
+                    watcher.overflowed = False
+                    self._on_log("inotify queue overflowed, rescanning watched folders", "warn")
+                    for p in polls.values():
+                        if not p.periodic:
+                            p.next_at = 0.0
+                for root in watcher.degraded:
+                    p = polls.get(root)
+                    if p is not None and not p.periodic:
+                        self._on_log(f"inotify watch limit reached, polling {p.fc['path']}", "warn")
+                        p.periodic = True
+                        p.next_at  = 0.0
+                watcher.degraded.clear()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            if watcher is not None:
+                watcher.close()
+
+    def _schedule_scans(self, s: _Session, polls: Iterable["_FolderPoll"],
+                        pool: ThreadPoolExecutor) -> None:
+        """Start due folder scans on the scan pool and flag scans running past their timeout."""
+        now = time.monotonic()
+        for p in polls:
+            if p.future is not None:
+                if p.future.done():
+                    p.future = None
+                    # Watched folders are scanned again only to finish a pass that ran
+                    # out of time or to pick up files handed back for another try
+                    root = p.fc["path"]
+                    if p.periodic or s.scanner.unfinished(root) or s.scanner.requeued(root):
+                        p.next_at = p.finished + p.interval
+                elif not p.overdue and p.timeout > 0 and now - p.started > p.timeout:
+                    p.overdue = True
+                    self._on_log(f"Scan of {p.fc['path']} is taking longer than "
+                                 f"{p.timeout:g}s (slow or unresponsive mount?), "
+                                 f"other folders continue", "warn")
                 continue
-            rel = os.path.relpath(abs_fp, folder_path)
-            self._on_log(f"New: {rel}  [{base_name}]", "info")
-            time.sleep(file_delay)
-            if not os.path.exists(abs_fp):
+            if now >= p.next_at:
+                p.started = now
+                p.overdue = False
+                p.next_at = float("inf")
+                p.future  = pool.submit(self._scan_folder, s, p)
+
+    def _scan_folder(self, s: _Session, p: "_FolderPoll") -> None:
+        deadline = p.started + p.budget if p.budget > 0 else None
+        found = self._safe_scan(s, p.fc, deadline)
+        left  = s.scanner.unfinished(p.fc["path"])
+        p.finished = time.monotonic()
+        p.duration = p.finished - p.started
+        p.scans   += 1
+        p.adapt(found, finished=not left)
+        self._wake(s)
+        if s.debug:
+            resume = f", {left} dir(s) left for next pass" if left else ""
+            self._on_log(f"Scan #{p.scans} {os.path.basename(p.fc['path'])}: {p.duration:.2f}s, "
+                         f"{found} found{resume}, next in {p.interval:g}s"
+                         f"  (queue: {s.queue.qsize()}, settling: {len(s.settling)})", "debug")
+
+    @staticmethod
+    def _wake(s: _Session) -> None:
+        s.wake.set()
+        if s.watcher is not None:
+            s.watcher.wake()
+
+    def _safe_scan(self, s: _Session, fc: dict, deadline: Optional[float] = None) -> int:
+        """Scan one folder; returns the number of new candidate files it yielded."""
+        found = 0
+        try:
+            for fp in s.scanner.iter_images(fc["path"], fc.get("recursive", False),
+                                            deadline, s.stop):
+                found += 1
+                if not self._enqueue(s, fc, fp):
+                    # Stopped while waiting for queue space: the scanner must yield it again
+                    s.scanner.requeue(fc["path"], fp)
+                    break
+        except Exception as e:
+            self._on_log(f"Error scanning {fc['path']}: {e}", "err")
+        return found
+
+    def _enqueue(self, s: _Session, fc: dict, fp: str, window: Optional[float] = None) -> bool:
+        """
+        Take in a candidate file.  It waits in the readiness tracker until it
+        stops changing for *window* seconds (default: the file settle delay)
+        or its container is complete; with neither to wait for it goes
+        straight to the delivery queue.
+        """
+        abs_fp = os.path.abspath(fp)
+        with s.lock:
+            if abs_fp in s.inflight:
+                return True
+        if self._seen.contains(abs_fp):
+            return True
+        rel = os.path.relpath(abs_fp, fc["path"])
+        old = self._seen.find_moved(abs_fp)
+        if old is not None:
+            # Same file under a new name or folder: it was already handled
+            self._outbox.rename(old, abs_fp)
+            with self._count_lock:
+                if old in self._partial:
+                    self._partial[abs_fp] = self._partial.pop(old)
+            self._on_log(f"Moved: {os.path.basename(old)} → {rel}, not sending again", "info")
+            return True
+        with s.lock:
+            s.inflight.add(abs_fp)
+        self._on_log(f"New: {rel}  [{os.path.basename(fc['path'])}]", "info")
+        if (s.settling.window if window is None else window) > 0 or s.settling.check is not None:
+            s.settling.add(abs_fp, fc, window)
+            return True
+        return self._put(s, _Job(fc, abs_fp))
+
+    def _put(self, s: _Session, job: _Job) -> bool:
+        """Queue a job for the delivery workers, blocking while the queue is full."""
+        while not s.stop.is_set():
+            try:
+                s.queue.put(job, timeout=_WATCH_TICK)
+                return True
+            except Full:
                 continue
+        with s.lock:
+            s.inflight.discard(job.path)
+        return False
+
+    def _release_settled(self, s: _Session) -> None:
+        """Queue the files that stopped changing; forget the ones that disappeared."""
+        if not len(s.settling):
+            return
+        ready, gone = s.settling.poll()
+        if gone:
+            with s.lock:
+                for path, _ in gone:
+                    s.inflight.discard(path)
+        for i, (path, fc) in enumerate(ready):
+            if not self._put(s, _Job(fc, path)):
+                for path, fc in ready[i:]:
+                    with s.lock:
+                        s.inflight.discard(path)
+                    s.scanner.requeue(fc["path"], path)
+                return
+
+    def _release_due(self, s: _Session) -> None:
+        """Move outbox jobs whose retry time has come into the delivery queue."""
+        free = s.queue.maxsize - s.queue.qsize()
+        if free <= 0:
+            return
+        with s.lock:
+            claimed = set(s.claimed)
+        for job in self._outbox.due(free, list(s.by_url), claimed):
+            fc = s.by_folder.get(job.folder) or {"path": job.folder}
             try:
-                if os.path.getsize(abs_fp) == 0:
-                    self._on_log(f"Empty, skipping: {rel}", "warn")
+                s.queue.put_nowait(_Job(fc, job.path, s.by_url[job.url], job))
+            except Full:
+                return
+            with s.lock:
+                s.claimed.add(job.id)
+
+    def _schedule(self, job: _Job, wh: dict, delay: float, attempts: int, error: str) -> None:
+        if job.outbox is not None:
+            self._outbox.reschedule(job.outbox.id, delay, attempts, error)
+        else:
+            self._outbox.push(job.path, job.fc["path"], wh.get("url", ""), wh.get("name", "?"),
+                              delay, attempts, error)
+
+    # ── Delivery stage (worker threads) ───────────────────────────────────────
+
+    def _deliver_loop(self, s: _Session) -> None:
+        try:
+            self._deliver_jobs(s)
+        finally:
+            with s.lock:
+                s.active_workers -= 1
+                last = s.active_workers == 0
+            if last:
+                if s.fanout is not None:
+                    s.fanout.shutdown(wait=False)
+                # Keep the pool if a new session was started while this one drained
+                if self._session is None:
+                    self._sender.close()
+
+    def _deliver_jobs(self, s: _Session) -> None:
+        carry: Optional[_Job] = None
+        while True:
+            if carry is not None:
+                job, carry = carry, None
+            else:
+                try:
+                    job = s.queue.get(timeout=_WATCH_TICK)
+                except Empty:
+                    if s.stop.is_set():
+                        return
                     continue
-            except Exception:
-                continue
-            all_ok = all(
-                self._send_to_webhook(abs_fp, wh, folder_path, timeout) for wh in webhooks
-            )
-            self._sent_files.add(abs_fp)
-            # Sound files live next to main.py (two levels up from core/)
-            root_dir = os.path.normpath(os.path.join(_SCRIPT_DIR, ".."))
-            snd = os.path.join(root_dir, "validation.mp3" if all_ok else "exclamation.mp3")
-            if os.path.isfile(snd):
-                self._audio.play(snd, volume)
-            self._sent_count += all_ok
-            self._fail_count += not all_ok
-            self._on_counters(self._sent_count, self._fail_count)
-
-    def _send_to_webhook(self, abs_fp: str, wh: dict, folder_path: str, timeout: int) -> bool:
-        fname = os.path.basename(abs_fp)
-        url   = wh.get("url", "")
+            jobs = [job]
+            try:
+                # Undelivered new files stay out of the seen index and outbox jobs stay
+                # in the outbox, so both are picked up on the next start
+                if s.stop.is_set() and not s.drain:
+                    continue
+                if s.batch_window > 0 and self._batchable(job):
+                    carry = self._collect(s, jobs)
+                self._deliver(s, jobs)
+            except Exception as e:
+                self._on_log(f"Error delivering {job.path}: {e}", "err")
+            finally:
+                for j in jobs:
+                    with s.lock:
+                        s.inflight.discard(j.path)
+                        if j.outbox is not None:
+                            s.claimed.discard(j.outbox.id)
+                    s.queue.task_done()
+
+    @staticmethod
+    def _batchable(job: _Job) -> bool:
+        return job.outbox is None and job.webhook is None
+
+    def _collect(self, s: _Session, jobs: List[_Job]) -> Optional[_Job]:
+        """
+        Grow *jobs* with new files arriving within the batching window, up to
+        the file and byte limits.  Returns a dequeued job that did not fit.
+        """
+        until = time.monotonic() + s.batch_window
+        size  = self._size(jobs[0].path)
+        while len(jobs) < s.batch_files:
+            remaining = until - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                nxt = s.queue.get(timeout=remaining)
+            except Empty:
+                break
+            nsize = self._size(nxt.path)
+            if not self._batchable(nxt) or size + nsize > s.batch_bytes:
+                return nxt
+            jobs.append(nxt)
+            size += nsize
+        return None
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _deliver(self, s: _Session, jobs: List[_Job]) -> None:
+        """
+        Send one file, or a batch of new files as one multi-attachment
+        message, to every webhook (or to the single webhook of an outbox retry).
+        """
+        items: List[Tuple[_Job, UploadPayload]] = []
+        digests: Dict[str, bytes] = {}
+        counted: List[bool] = []
+        try:
+            try:
+                for job in jobs:
+                    payload = self._prepare(s, job)
+                    if payload is None:
+                        continue
+                    if (s.dedup_window > 0 and job.outbox is None
+                            and self._duplicate(s, job, payload, digests)):
+                        payload.close()
+                        self._seen.add(job.path)
+                        continue
+                    items.append((job, payload))
+                if not items:
+                    return
+                first = items[0][0]
+                # Every webhook is attempted and recorded, even after an earlier one failed
+                outcomes = self._fan_out(s, [p for _, p in items],
+                                         [first.webhook] if first.webhook else s.webhooks)
+                results  = self._settle(s, items, outcomes)
+            finally:
+                for _, payload in items:
+                    payload.close()
+            for (job, _), res in zip(items, results):
+                self._seen.add(job.path)
+                # Deferred sends still count as sent here: the outbox will deliver them
+                if job.path in digests and (not res or any(res)):
+                    self._hashes.mark_sent(digests[job.path], job.path, s.dedup_window)
+                ok = self._tally(job, res)
+                if ok is not None:
+                    counted.append(ok)
+        finally:
+            # Release the claimed digests even on error, or later copies would be
+            # skipped as duplicates of a send that never happened
+            if digests:
+                with s.lock:
+                    for digest in digests.values():
+                        s.sending.pop(digest, None)
+        if not counted:
+            return
+        ok_n = sum(counted)
+        # Sound files live next to main.py (two levels up from core/)
+        root_dir = os.path.normpath(os.path.join(_SCRIPT_DIR, ".."))
+        snd = os.path.join(root_dir, "validation.mp3" if ok_n == len(counted) else "exclamation.mp3")
+        if os.path.isfile(snd):
+            self._audio.play(snd, s.volume)
+        with self._count_lock:
+            self._sent_count += ok_n
+            self._fail_count += len(counted) - ok_n
+            sent, fail = self._sent_count, self._fail_count
+        self._on_counters(sent, fail)
+
+    def _tally(self, job: _Job, res: List[bool]) -> Optional[bool]:
+        """
+        Fold one round of a file's results into its running outcome and
+        close its outbox job.  Returns whether the file was delivered
+        everywhere once no webhook has a job left for it, else None, so each
+        file is counted exactly once however its sends were retried.
+        """
+        with self._count_lock:
+            # The job is closed under the lock so that concurrent retries of the
+            # same file agree on which of them settled it last
+            if job.outbox is not None and res:
+                self._outbox.remove(job.outbox.id)
+            ok = self._partial.pop(job.path, True) and all(res)
+            if self._outbox.has_path(job.path):
+                self._partial[job.path] = ok
+                return None
+            return ok
+
+    def _duplicate(self, s: _Session, job: _Job, payload: UploadPayload,
+                   digests: Dict[str, bytes]) -> bool:
+        """True if an identical file was already sent within the dedup window (or is in this batch)."""
+        digest = self._hashes.digest(job.path, payload.data)
+        if digest is None:
+            return False
+        rel = os.path.relpath(job.path, job.fc["path"])
+        with s.lock:
+            # A copy being sent right now by any worker counts as already sent
+            first = s.sending.get(digest)
+            if first is None:
+                first = self._hashes.first_sent(digest, s.dedup_window)
+            if first is None:
+                s.sending[digest] = job.path
+        if first is not None:
+            self._on_log(f"Duplicate of {os.path.basename(first)}, skipping: {rel}", "info")
+            return True
+        digests[job.path] = digest
+        return False
+
+    def _prepare(self, s: _Session, job: _Job) -> Optional[UploadPayload]:
+        """Open the file for upload, or return None (handing it back if it is not ready yet)."""
+        abs_fp = job.path
+        rel = os.path.relpath(abs_fp, job.fc["path"])
+        if not os.path.exists(abs_fp):
+            if job.outbox is not None:
+                self._on_log(f"Gone, dropping retry: {rel}", "warn")
+                with self._count_lock:
+                    self._outbox.remove(job.outbox.id)
+                    if not self._outbox.has_path(abs_fp):
+                        self._partial.pop(abs_fp, None)
+            return None
+        try:
+            if os.path.getsize(abs_fp) == 0:
+                self._on_log(f"Empty, skipping: {rel}", "warn")
+                s.retry.put((job.fc, abs_fp))
+                return None
+            return UploadPayload(abs_fp)
+        except OSError as e:
+            if os.path.exists(abs_fp):
+                self._on_log(f"Cannot read {rel}: {e}", "warn")
+                s.retry.put((job.fc, abs_fp))
+            return None
+
+    def _fan_out(self, s: _Session, payloads: List[UploadPayload],
+                 webhooks: list) -> List[Tuple[dict, _Outcome]]:
+        """
+        Send the payload(s) to every webhook concurrently.  Webhooks still
+        running when the per-image deadline expires count as failed; their
+        late result is only logged.
+        """
+        if len(webhooks) == 1 or s.fanout is None:
+            return [(wh, self._send_to_webhook(payloads, wh, s.timeout)) for wh in webhooks]
+        futures = {s.fanout.submit(self._send_to_webhook, payloads, wh, s.timeout): wh
+                   for wh in webhooks}
+        done, _ = wait(futures, timeout=s.deadline or None)
+        outcomes = []
+        for fut, wh in futures.items():
+            if fut in done:
+                try:
+                    outcome = fut.result()
+                except Exception as e:
+                    outcome = _Outcome(False, "Error", type(e).__name__, str(e)[:120], str(e))
+            else:
+                if not fut.cancel():
+                    fut.add_done_callback(
+                        lambda f, name=payloads[0].filename, wh=wh: self._late_result(f, name, wh))
+                outcome = _Outcome(False, "Deadline", "Deadline",
+                                   f"No response within {s.deadline:g}s")
+            outcomes.append((wh, outcome))
+        return outcomes
+
+    def _late_result(self, fut: Future, filename: str, wh: dict) -> None:
+        """Log how a send abandoned at the deadline finally ended."""
+        if fut.cancelled():
+            return
+        try:
+            ok = fut.result().ok
+        except Exception:
+            ok = False
+        self._on_log(f"Late {'delivery' if ok else 'failure'} after deadline  "
+                     f"{filename}  →  {wh.get('name', '?')}", "warn" if ok else "err")
+
+    def _settle(self, s: _Session, items: List[Tuple[_Job, UploadPayload]],
+                outcomes: List[Tuple[dict, _Outcome]]) -> List[List[bool]]:
+        """
+        Record each (file, webhook) result.  Rate-limited and retryable sends
+        go to the outbox instead and are left out of that file's results.
+        Sends refused by an open circuit count against the attempt limit, so a
+        webhook that stays down fails its backlog instead of growing it.
+        """
+        results: List[List[bool]] = [[] for _ in items]
+        for wh, outcome in outcomes:
+            for res, (job, payload) in zip(results, items):
+                attempts = job.outbox.attempts if job.outbox is not None else 0
+                target   = f"{payload.filename}  →  {wh.get('name', '?')}"
+                tries = attempts + 1 if outcome.err_type == "Circuit Open" else attempts
+                if outcome.retry_after > 0 and tries < s.max_attempts:
+                    self._on_log(f"{outcome.label}  {target}, retrying in "
+                                 f"{outcome.retry_after:.1f}s", "warn")
+                    self._schedule(job, wh, outcome.retry_after, tries, outcome.detail)
+                    continue
+                if (not outcome.ok and outcome.err_type in _RETRYABLE
+                        and attempts + 1 < s.max_attempts):
+                    delay = backoff_delay(attempts + 1, s.retry_base)
+                    self._on_log(f"{outcome.label}  {target}, retry {attempts + 1}/"
+                                 f"{s.max_attempts - 1} in {delay:.1f}s", "warn")
+                    self._schedule(job, wh, delay, attempts + 1, outcome.detail)
+                    continue
+                # The outbox job of a retry is closed by _tally once the file is counted
+                res.append(self._record(outcome, payload, wh, job.fc["path"]))
+        return results
+
+    def _record(self, outcome: _Outcome, payload: UploadPayload, wh: dict, folder_path: str) -> bool:
+        fname = payload.filename
         name  = wh.get("name", "?")
-        ext   = os.path.splitext(fname)[1].lower()
+        msg   = f"{fname}  →  {name}"
+        if outcome.label:
+            msg = f"{outcome.label}  {msg}"
+        if outcome.note:
+            msg = f"{msg}: {outcome.note}"
+        self._on_log(msg, "ok" if outcome.ok else "err")
+        self._stats.record_send(ok=outcome.ok, file=fname, webhook=name,
+                                folder=folder_path, ext=os.path.splitext(fname)[1].lower(),
+                                err_type=outcome.err_type, detail=outcome.detail)
+        return outcome.ok
+
+    def _send_to_webhook(self, payloads: List[UploadPayload], wh: dict, timeout: int) -> _Outcome:
+        """Send through the webhook's circuit breaker; an open circuit defers the send."""
+        url  = wh.get("url", "")
+        wait = self._breaker.allow(url)
+        if wait > 0:
+            return _Outcome(False, "Circuit open", "Circuit Open",
+                            f"Webhook circuit open, next probe in {wait:.0f}s", retry_after=wait)
+        outcome = self._attempt(payloads, wh, timeout)
+        if outcome.retry_after > 0:
+            self._breaker.release(url)
+            return outcome
+        change = self._breaker.record(url, outcome.ok)
+        name   = wh.get("name", "?")
+        if change == OPEN:
+            self._on_log(f"Circuit open for {name} ({outcome.label or 'failed'}), pausing sends", "warn")
+            self._stats.record_error(err_type="Circuit Open", webhook=name,
+                                     detail=outcome.detail or outcome.label)
+        elif change is not None:
+            self._on_log(f"Circuit closed for {name}, webhook recovered", "ok")
+        return outcome
+
+    def _attempt(self, payloads: List[UploadPayload], wh: dict, timeout: int) -> _Outcome:
+        url = wh.get("url", "")
 
         profile    = wh.get("_resolved_profile") or {}
         username   = profile.get("username", "")
         avatar_url = profile.get("avatar_url", "")
 
-        def _record(ok: bool, log_msg: str, log_kind: str,
-                    err_type: str = "", detail: str = "") -> bool:
-            self._on_log(log_msg, log_kind)
-            self._stats.record_send(ok=ok, file=fname, webhook=name,
-                                    folder=folder_path, ext=ext,
-                                    err_type=err_type, detail=detail)
-            return ok
-
         try:
-            ok = self._sender.send(abs_fp, url, timeout, username=username, avatar_url=avatar_url)
+            if len(payloads) == 1:
+                ok = self._sender.send_payload(payloads[0], url, timeout,
+                                               username=username, avatar_url=avatar_url)
+            else:
+                ok = self._sender.send_batch(payloads, url, timeout,
+                                             username=username, avatar_url=avatar_url)
             if ok:
-                return _record(True, f"{fname}  →  {name}", "ok")
-            return _record(False, f"Non-2xx  {fname}  →  {name}", "err",
-                           "HTTP Error", "Non-2xx response")
+                return _Outcome(True)
+            return _Outcome(False, "Non-2xx", "HTTP Error", "Non-2xx response")
+        except RateLimitedError as e:
+            return _Outcome(False, "Rate limited", "Rate Limited", str(e),
+                            retry_after=max(e.retry_after, 0.05))
         except tuple(exc for exc, _, __ in _SEND_ERRORS) as e:
             for exc_type, log_label, err_label in _SEND_ERRORS:
                 if isinstance(e, exc_type):
-                    return _record(False, f"{log_label}  {fname}  →  {name}", "err",
-                                   err_label, str(e)[:120])
+                    return _Outcome(False, log_label, err_label, str(e)[:120])
         except Exception as e:
-            return _record(False, f"Error  {fname}  →  {name}: {e}", "err",
-                           type(e).__name__, str(e)[:120])
-        return False
+            return _Outcome(False, "Error", type(e).__name__, str(e)[:120], str(e))
+        return _Outcome(False, "Error", "Unknown")
@@ -0,0 +1,61 @@
+"""
+services/multipart.py
+---------------------
+MultipartStream: a multipart/form-data request body produced in chunks.
+"""
+
+import os
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+# Size of the slices handed to the socket for file contents
+_CHUNK = 64 * 1024
+
+Data = Union[bytes, str, memoryview]
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class MultipartStream:
+    """
+    Iterable request body with a precomputed length, so requests sends it
+    with a ``Content-Length`` header instead of assembling the whole body in
+    memory.  File contents are yielded as ``memoryview`` slices of the
+    caller's buffer (usually an mmap), so an upload costs the part headers
+    plus one chunk at a time, regardless of file size.
+
+    Each field is ``(name, filename, content_type, data)``; pass ``None`` as
+    filename for a plain form field.
+    """
+
+    def __init__(self, fields: Sequence[Tuple[str, Optional[str], str, Data]],
+                 chunk_size: int = _CHUNK):
+        self.boundary     = os.urandom(16).hex()
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._chunk = max(1, chunk_size)
+        self._parts: List[Tuple[bytes, memoryview]] = []
+        for name, filename, ctype, data in fields:
+            disp = f'form-data; name="{_quote(name)}"'
+            if filename is not None:
+                disp += f'; filename="{_quote(filename)}"'
+            head = (f"--{self.boundary}\r\n"
+                    f"Content-Disposition: {disp}\r\n"
+                    f"Content-Type: {ctype}\r\n\r\n").encode("utf-8")
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            self._parts.append((head, memoryview(data).cast("B")))
+        self._tail   = f"--{self.boundary}--\r\n".encode("ascii")
+        self._length = (sum(len(h) + v.nbytes + 2 for h, v in self._parts)
+                        + len(self._tail))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Union[bytes, memoryview]]:
+        for head, view in self._parts:
+            yield head
+            for off in range(0, view.nbytes, self._chunk):
+                yield view[off:off + self._chunk]
+            yield b"\r\n"
+        yield self._tail
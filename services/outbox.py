@@ -0,0 +1,110 @@
+"""
+services/outbox.py
+------------------
+Outbox: durable (file, webhook) delivery jobs awaiting a retry, kept in SQLite.
+"""
+
+import random
+import sqlite3
+import time
+from threading import Lock
+from typing import Collection, List, NamedTuple
+
+from services.seen_index import open_state_db
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    path         TEXT    NOT NULL,
+    folder       TEXT    NOT NULL,
+    webhook_url  TEXT    NOT NULL,
+    webhook_name TEXT    NOT NULL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    next_at      REAL    NOT NULL,
+    last_error   TEXT    NOT NULL DEFAULT '',
+    UNIQUE (path, webhook_url)
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_at);
+"""
+
+
+class OutboxJob(NamedTuple):
+    id:       int
+    path:     str
+    folder:   str
+    url:      str
+    name:     str
+    attempts: int
+
+
+def backoff_delay(attempts: int, base: float, cap: float = 3600.0) -> float:
+    """Full-jitter exponential backoff: a random delay in [d/2, d], d = base * 2^(attempts-1)."""
+    d = min(cap, base * (2 ** max(0, attempts - 1)))
+    return random.uniform(d / 2, d)
+
+
+class Outbox:
+    """
+    Jobs survive restarts: a pending job is picked up again by the next
+    monitoring session once its ``next_at`` time has passed.
+    """
+
+    def __init__(self, path: str):
+        self._lock = Lock()
+        try:
+            self._db = open_state_db(path)
+        except sqlite3.Error as e:
+            print(f"Error opening outbox {path!r}: {e}")
+            self._db = open_state_db("")
+        self._db.executescript(_SCHEMA)
+
+    def push(self, path: str, folder: str, url: str, name: str,
+             delay: float, attempts: int = 0, error: str = "") -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO outbox (path, folder, webhook_url, webhook_name, attempts, next_at, last_error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (path, webhook_url) DO UPDATE SET"
+                "   attempts = excluded.attempts, next_at = excluded.next_at,"
+                "   last_error = excluded.last_error",
+                (path, folder, url, name, attempts, time.time() + delay, error))
+
+    def reschedule(self, job_id: int, delay: float, attempts: int, error: str = "") -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE outbox SET next_at = ?, attempts = ?, last_error = ? WHERE id = ?",
+                (time.time() + delay, attempts, error, job_id))
+
+    def rename(self, old_path: str, new_path: str) -> None:
+        """Point pending jobs of a file that was moved at its new path."""
+        with self._lock:
+            self._db.execute("UPDATE OR IGNORE outbox SET path = ? WHERE path = ?", (new_path, old_path))
+
+    def remove(self, job_id: int) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM outbox WHERE id = ?", (job_id,))
+
+    def due(self, limit: int, urls: Collection[str],
+            exclude: Collection[int] = ()) -> List[OutboxJob]:
+        """Jobs whose retry time has passed, for the given webhook URLs only."""
+        if limit <= 0 or not urls:
+            return []
+        marks = ",".join("?" * len(urls))
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, path, folder, webhook_url, webhook_name, attempts FROM outbox"
+                f" WHERE next_at <= ? AND webhook_url IN ({marks})"
+                " ORDER BY next_at LIMIT ?",
+                (time.time(), *urls, limit + len(exclude))).fetchall()
+        return [OutboxJob(*r) for r in rows if r[0] not in exclude][:limit]
+
+    def has_path(self, path: str) -> bool:
+        """True while any webhook still has a job pending for *path*."""
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM outbox WHERE path = ? LIMIT 1",
+                                    (path,)).fetchone() is not None
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
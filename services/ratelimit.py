@@ -0,0 +1,134 @@
+"""
+services/ratelimit.py
+---------------------
+RateLimiter: per-webhook token buckets fed by Discord's rate-limit headers.
+"""
+
+import json
+import time
+from threading import Lock
+from typing import Dict, Mapping, Optional
+
+# Discord allows roughly 5 webhook executions per 2 seconds per webhook
+_DEFAULT_BURST = 5
+_DEFAULT_RATE  = 2.5
+_GLOBAL_KEY    = "*"
+
+
+class RateLimitedError(Exception):
+    """The send was not attempted or was rejected with 429; retry after ``retry_after`` s."""
+
+    def __init__(self, retry_after: float, scope: str = "webhook"):
+        super().__init__(f"rate limited ({scope}), retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+        self.scope       = scope
+
+
+class _Bucket:
+    def __init__(self, capacity: float, rate: float):
+        self.capacity      = capacity
+        self.rate          = rate
+        self.tokens        = capacity
+        self.updated       = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self, now: float) -> None:
+        self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RateLimiter:
+    """
+    Paces requests per key (webhook URL) with a token bucket, and blocks a key
+    until the reset announced by ``X-RateLimit-Remaining: 0`` /
+    ``X-RateLimit-Reset-After`` or a 429 ``retry_after`` has passed.
+    """
+
+    def __init__(self, burst: int = _DEFAULT_BURST, rate: float = _DEFAULT_RATE,
+                 max_wait: float = 2.0):
+        self._burst    = burst
+        self._rate     = rate
+        self._max_wait = max_wait
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = Lock()
+
+    def _bucket(self, key: str) -> _Bucket:
+        b = self._buckets.get(key)
+        if b is None:
+            b = self._buckets[key] = _Bucket(self._burst, self._rate)
+        return b
+
+    def acquire(self, key: str) -> None:
+        """
+        Take a token for *key*, sleeping for short waits.  Raises
+        RateLimitedError when the wait would exceed ``max_wait`` so the caller
+        can requeue the send instead of holding a worker.
+        """
+        while True:
+            with self._lock:
+                now  = time.monotonic()
+                b    = self._bucket(key)
+                glob = self._buckets.get(_GLOBAL_KEY)
+                b.refill(now)
+                wait = max(b.blocked_until, glob.blocked_until if glob else 0.0) - now
+                if wait <= 0 and b.tokens >= 1:
+                    b.tokens -= 1
+                    return
+                if wait <= 0:
+                    wait = (1 - b.tokens) / b.rate
+            if wait > self._max_wait:
+                raise RateLimitedError(wait)
+            time.sleep(wait)
+
+    def update(self, key: str, status: int, headers: Mapping[str, str],
+               body: bytes = b"") -> Optional[float]:
+        """Learn from a response. Returns the retry delay when the response was a 429."""
+        now = time.monotonic()
+        with self._lock:
+            b = self._bucket(key)
+            try:
+                limit = int(headers.get("X-RateLimit-Limit", 0))
+                if limit > 0:
+                    b.capacity = limit
+                remaining = headers.get("X-RateLimit-Remaining")
+                reset     = headers.get("X-RateLimit-Reset-After")
+                if remaining is not None:
+                    b.refill(now)
+                    b.tokens = min(b.tokens, float(remaining))
+                    if float(remaining) <= 0 and reset is not None:
+                        b.blocked_until = max(b.blocked_until, now + float(reset))
+            except ValueError:
+                pass
+            if status != 429:
+                return None
+            retry_after, is_global = self._parse_429(headers, body)
+            target = self._bucket(_GLOBAL_KEY) if is_global else b
+            target.blocked_until = max(target.blocked_until, now + retry_after)
+            b.tokens = 0
+            return retry_after
+
+    @staticmethod
+    def _parse_429(headers: Mapping[str, str], body: bytes):
+        retry_after, is_global = None, headers.get("X-RateLimit-Global", "").lower() == "true"
+        try:
+            data = json.loads(body or b"{}")
+            retry_after = float(data.get("retry_after")) if "retry_after" in data else None
+            is_global   = is_global or bool(data.get("global"))
+        except (ValueError, TypeError, AttributeError):
+            pass
+        if retry_after is None:
+            try:
+                retry_after = float(headers.get("Retry-After") or headers.get("X-RateLimit-Reset-After") or 1.0)
+            except ValueError:
+                retry_after = 1.0
+        return max(0.0, retry_after), is_global
+
+    def snapshot(self) -> Dict[str, float]:
+        """Seconds until each throttled key may send again (only keys currently blocked)."""
+        now = time.monotonic()
+        with self._lock:
+            glob = self._buckets.get(_GLOBAL_KEY)
+            floor = glob.blocked_until if glob else 0.0
+            return {key: max(b.blocked_until, floor) - now
+                    for key, b in self._buckets.items()
+                    if key != _GLOBAL_KEY and max(b.blocked_until, floor) > now}
@@ -0,0 +1,114 @@
+"""
+services/readiness.py
+---------------------
+ReadinessTracker: holds detected files until they stop changing.
+"""
+
+import os
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# How often a file whose container is still incomplete is looked at again
+_RECHECK = 0.25
+
+# An incomplete file that has not changed for this long is released anyway
+# (e.g. a JPEG with trailing garbage that will never end in FFD9)
+_INCOMPLETE_GRACE = 30.0
+
+
+class _Candidate:
+    __slots__ = ("tag", "window", "size", "mtime_ns", "since", "written", "complete")
+
+    def __init__(self, tag: Any, window: float, size: int, mtime_ns: int, since: float):
+        self.tag      = tag
+        self.window   = window
+        self.size     = size
+        self.mtime_ns = mtime_ns
+        self.since    = since
+        # mtime of a file that was already there when first looked at, until it changes
+        self.written: Optional[float] = None
+        self.complete: Optional[bool] = None
+
+
+class ReadinessTracker:
+    """
+    Non-blocking settle check for many files at once.  Each candidate's
+    (size, mtime) is compared on every poll(); a file is released once it is
+    non-empty and has not changed for ``window`` seconds since it was last
+    seen changing.  A file found unchanged on its first look may be released
+    by its own mtime instead, unless that lies in the future (the clock of a
+    network share can run ahead of ours).  Files that vanish are dropped.
+    Scan threads add() while the monitor thread polls.
+
+    With a *check* (path, size) -> True / False / None, a file judged complete
+    is released at once and one judged incomplete is held regardless of the
+    window; None falls back to the window.  The check only runs again after
+    the file changed.
+
+    add() may give a candidate its own, shorter window (e.g. a file whose
+    writer already reported it closed).
+    """
+
+    def __init__(self, window: float,
+                 check: Optional[Callable[[str, int], Optional[bool]]] = None):
+        self.window = max(0.0, window)
+        self.check  = check
+        self._pending: Dict[str, _Candidate] = {}
+        self._next: Optional[float] = None
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, path: str, tag: Any = None, window: Optional[float] = None) -> None:
+        window = self.window if window is None else max(0.0, window)
+        with self._lock:
+            if path not in self._pending:
+                # size -1 forces a first observation on the next poll
+                self._pending[path] = _Candidate(tag, window, -1, 0, time.time())
+                self._next = 0.0
+
+    def poll(self) -> Tuple[List[Tuple[str, Any]], List[Tuple[str, Any]]]:
+        """Check every candidate. Returns (ready, gone) as lists of (path, tag)."""
+        with self._lock:
+            now = time.time()
+            ready, gone = [], []
+            soonest: Optional[float] = None
+            for path, c in list(self._pending.items()):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    del self._pending[path]
+                    gone.append((path, c.tag))
+                    continue
+                if st.st_size != c.size or st.st_mtime_ns != c.mtime_ns:
+                    first = c.size < 0
+                    c.size, c.mtime_ns, c.since = st.st_size, st.st_mtime_ns, now
+                    # Only the first look can trust the mtime; a change seen later
+                    # proves the writer is still active whatever the mtime says
+                    c.written = st.st_mtime if first and st.st_mtime <= now else None
+                    if self.check is not None and c.size > 0:
+                        c.complete = self.check(path, c.size)
+                # An mtime older than the window means the writer already went quiet
+                quiet = now - (c.since if c.written is None else min(c.since, c.written))
+                if c.size > 0 and (c.complete
+                                   or (c.complete is None and quiet >= c.window)
+                                   or (c.complete is False and now - c.since >= _INCOMPLETE_GRACE)):
+                    del self._pending[path]
+                    ready.append((path, c.tag))
+                    continue
+                if c.size <= 0:
+                    # Empty files are usually placeholders about to be written; look again later
+                    left = max(c.window, 1.0)
+                elif c.complete is False:
+                    left = _RECHECK
+                else:
+                    left = c.window - quiet
+                soonest = left if soonest is None else min(soonest, left)
+            self._next = soonest
+            return ready, gone
+
+    def next_check(self) -> Optional[float]:
+        """Seconds until the earliest candidate may become ready (None when idle)."""
+        return self._next
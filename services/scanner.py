@@ -2,27 +2,176 @@
 services/scanner.py
 -------------------
 FolderScanner: iterates image files inside a directory.
+
+Listings are cached per directory together with the directory's mtime, so a
+scan only re-lists directories that changed since the previous pass and only
+yields files that were not part of the previous listing.  Passes can be
+time-budgeted: an unfinished pass leaves a cursor that the next one resumes.
 """
 
 import os
+import time
+from threading import Event, Lock
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set
+
+# A directory whose mtime is this close to "now" may still receive entries
+# within the same timestamp tick, so its cached listing is not trusted.
+_RACY_WINDOW = 2.0
+
+# Hotspots are dropped after this long without new files; at most _HOT_MAX per root
+_HOT_TTL = 600.0
+_HOT_MAX = 64
+
+
+class _DirListing(NamedTuple):
+    mtime_ns: int
+    racy:     bool
+    files:    FrozenSet[str]
+    subdirs:  List[str]
 
 
 class FolderScanner:
+    """Different roots may be scanned from different threads; one root at a time."""
+
     def __init__(self, formats: set):
         self._formats = formats
+        self._trees:   Dict[str, Dict[str, _DirListing]] = {}
+        self._retry:   Dict[str, Set[str]] = {}
+        # Per root: directories still to visit when a scan ran out of time,
+        # and recently active directories (hotspots) with when they last had new files
+        self._cursors: Dict[str, List[str]] = {}
+        self._hot:     Dict[str, Dict[str, float]] = {}
+        self._lock = Lock()
+
+    def matches(self, name: str) -> bool:
+        return os.path.splitext(name)[1].lower() in self._formats
+
+    def requeue(self, root: str, path: str) -> None:
+        """Yield *path* again on the next scan of *root* (e.g. file was not ready yet)."""
+        self._requeue(root, [path])
+
+    def _requeue(self, root: str, paths: List[str]) -> None:
+        with self._lock:
+            self._retry.setdefault(root, set()).update(paths)
 
-    def iter_images(self, root: str, recursive: bool):
-        if recursive:
-            for dirpath, _, files in os.walk(root):
-                for fn in files:
-                    if os.path.splitext(fn)[1].lower() in self._formats:
-                        yield os.path.join(dirpath, fn)
-        else:
+    def forget(self, root: str) -> None:
+        with self._lock:
+            self._trees.pop(root, None)
+            self._retry.pop(root, None)
+            self._cursors.pop(root, None)
+            self._hot.pop(root, None)
+
+    def iter_images(self, root: str, recursive: bool, deadline: Optional[float] = None,
+                    stop: Optional[Event] = None):
+        """
+        Yield files of *root* that are new since its previous scan.
+
+        Directories where new files appeared recently (hotspots) are checked
+        first on every call.  Past *deadline* (a time.monotonic() value), or
+        once *stop* is set, the walk ends at the next directory and the
+        directories still to visit are kept as a cursor, so the next call
+        resumes where this one left off instead of starting over.
+        """
+        with self._lock:
+            cache   = self._trees.setdefault(root, {})
+            hot     = self._hot.setdefault(root, {})
+            pending = sorted(self._retry.pop(root, ()))
+            stack   = self._cursors.pop(root, None) or [root]
+        visited = 0
+        try:
+            for i, fp in enumerate(pending):
+                try:
+                    yield fp
+                except GeneratorExit:
+                    self._requeue(root, pending[i:])
+                    raise
+            self._expire_hot(hot)
+            for dirpath in sorted(hot, key=hot.get, reverse=True):
+                yield from self._visit(root, cache, hot, dirpath, None)
+            while stack:
+                if visited and ((deadline is not None and time.monotonic() > deadline)
+                                or (stop is not None and stop.is_set())):
+                    return
+                visited += 1
+                yield from self._visit(root, cache, hot, stack.pop(), stack if recursive else None)
+        finally:
+            if stack:
+                with self._lock:
+                    self._cursors[root] = stack
+
+    def _visit(self, root: str, cache: Dict[str, _DirListing], hot: Dict[str, float],
+               dirpath: str, stack: Optional[List[str]]):
+        """Yield new files of one directory; its subdirectories go on *stack* (if given)."""
+        try:
+            st = os.stat(dirpath)
+        except OSError:
+            self._prune(cache, dirpath)
+            hot.pop(dirpath, None)
+            return
+        prev = cache.get(dirpath)
+        if prev is not None and prev.mtime_ns == st.st_mtime_ns and not prev.racy:
+            if stack is not None:
+                stack.extend(prev.subdirs)
+            return
+        listing = self._list_dir(dirpath, st)
+        if listing is None:
+            return
+        if prev is not None:
+            for gone in set(prev.subdirs).difference(listing.subdirs):
+                self._prune(cache, gone)
+        cache[dirpath] = listing
+        if stack is not None:
+            stack.extend(listing.subdirs)
+        new = listing.files if prev is None else listing.files - prev.files
+        if new and prev is not None:
+            hot[dirpath] = time.monotonic()
+        fresh = [os.path.join(dirpath, fn) for fn in sorted(new)]
+        for i, fp in enumerate(fresh):
             try:
-                with os.scandir(root) as it:
-                    for entry in it:
-                        if entry.is_file() and \
-                                os.path.splitext(entry.name)[1].lower() in self._formats:
-                            yield entry.path
-            except Exception:
-                pass
+                yield fp
+            except GeneratorExit:
+                self._requeue(root, fresh[i:])
+                raise
+
+    def unfinished(self, root: str) -> int:
+        """Directories left for the next scan of *root* to visit (0 once a pass completed)."""
+        with self._lock:
+            return len(self._cursors.get(root, ()))
+
+    def requeued(self, root: str) -> int:
+        """Files handed back with requeue() that the next scan of *root* will yield again."""
+        with self._lock:
+            return len(self._retry.get(root, ()))
+
+    @staticmethod
+    def _expire_hot(hot: Dict[str, float]) -> None:
+        cutoff = time.monotonic() - _HOT_TTL
+        for d in [d for d, t in hot.items() if t < cutoff]:
+            del hot[d]
+        if len(hot) > _HOT_MAX:
+            for d in sorted(hot, key=hot.get)[:len(hot) - _HOT_MAX]:
+                del hot[d]
+
+    def _list_dir(self, dirpath: str, st: os.stat_result):
+        files, subdirs = [], []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.is_file() and self.matches(entry.name):
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        racy = time.time() - st.st_mtime < _RACY_WINDOW
+        return _DirListing(st.st_mtime_ns, racy, frozenset(files), subdirs)
+
+    @staticmethod
+    def _prune(cache: Dict[str, _DirListing], dirpath: str) -> None:
+        cache.pop(dirpath, None)
+        prefix = dirpath.rstrip(os.sep) + os.sep
+        for key in [k for k in cache if k.startswith(prefix)]:
+            del cache[key]
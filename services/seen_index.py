@@ -0,0 +1,311 @@
+"""
+services/seen_index.py
+----------------------
+SeenIndex: durable record of files that were already handled, kept in SQLite.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from array import array
+from threading import Event, Lock
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    path     TEXT PRIMARY KEY,
+    dev      INTEGER NOT NULL,
+    ino      INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    seen_at  REAL    NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS seen_identity ON seen (dev, ino);
+CREATE TABLE IF NOT EXISTS seen_roots (
+    path      TEXT PRIMARY KEY,
+    primed_at REAL NOT NULL,
+    recursive INTEGER NOT NULL DEFAULT 0,
+    formats   TEXT    NOT NULL DEFAULT ''
+) WITHOUT ROWID;
+"""
+
+_BATCH = 5000
+
+# Maximum fill of the in-memory hash table before it doubles
+_MAX_LOAD = 0.7
+
+
+def _path_hash(path: str) -> int:
+    h = int.from_bytes(hashlib.blake2b(path.encode("utf-8", "surrogateescape"),
+                                       digest_size=8).digest(), "little")
+    return h or 1   # 0 marks an empty slot
+
+
+class _PathHashes:
+    """
+    Open-addressing set of 64-bit path hashes in a flat ``array('Q')``:
+    about 12-16 bytes per entry instead of a full path string.  Linear
+    probing; removal uses backward shifting, so there are no tombstones.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        size = 1024
+        while size * _MAX_LOAD < capacity:
+            size *= 2
+        self._table = array("Q", bytes(8 * size))
+        self._mask  = size - 1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return self._table.itemsize * len(self._table)
+
+    def _slot(self, h: int) -> int:
+        i = h & self._mask
+        table = self._table
+        while table[i] and table[i] != h:
+            i = (i + 1) & self._mask
+        return i
+
+    def __contains__(self, h: int) -> bool:
+        return self._table[self._slot(h)] == h
+
+    def add(self, h: int) -> None:
+        i = self._slot(h)
+        if self._table[i] == h:
+            return
+        self._table[i] = h
+        self._count += 1
+        if self._count > _MAX_LOAD * len(self._table):
+            self._grow()
+
+    def discard(self, h: int) -> None:
+        table, mask = self._table, self._mask
+        i = self._slot(h)
+        if table[i] != h:
+            return
+        j = i
+        while True:
+            j = (j + 1) & mask
+            if not table[j]:
+                break
+            home = table[j] & mask
+            # Move the entry back unless its home slot lies cyclically in (i, j]
+            if (home <= i < j) or (i < j < home) or (j < home <= i):
+                table[i] = table[j]
+                i = j
+        table[i] = 0
+        self._count -= 1
+
+    def _grow(self) -> None:
+        old = self._table
+        self._table = array("Q", bytes(16 * len(old)))
+        self._mask  = len(self._table) - 1
+        for h in old:
+            if h:
+                self._table[self._slot(h)] = h
+
+
+def open_state_db(path: str) -> sqlite3.Connection:
+    """Open the shared monitor-state database (WAL, usable from any thread)."""
+    db = sqlite3.connect(path or ":memory:", check_same_thread=False,
+                         isolation_level=None, timeout=10)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+class SeenIndex:
+    """
+    Files are keyed by absolute path and also carry their (st_dev, st_ino,
+    size, mtime) identity.  Roots are remembered once their existing content
+    has been recorded, so later sessions resume from the stored state instead
+    of walking every folder again.
+
+    A compact in-memory set of path hashes answers most lookups for unseen
+    files without touching SQLite; a hash hit is confirmed against the table.
+    The set is built by load_hashes() (on the monitor thread, as it reads
+    every stored path); until then lookups go to SQLite.
+    """
+
+    def __init__(self, path: str):
+        self._lock = Lock()
+        try:
+            self._db = open_state_db(path)
+        except sqlite3.Error as e:
+            print(f"Error opening seen index {path!r}: {e}")
+            self._db = open_state_db("")
+        self._db.executescript(_SCHEMA)
+        cols = {r[1] for r in self._db.execute("PRAGMA table_info(seen_roots)")}
+        if "formats" not in cols:
+            # Roots primed before the scope was stored count as covering no formats,
+            # so their next start records the existing files once more (keeping records)
+            self._db.execute("ALTER TABLE seen_roots ADD COLUMN recursive INTEGER NOT NULL DEFAULT 0")
+            self._db.execute("ALTER TABLE seen_roots ADD COLUMN formats TEXT NOT NULL DEFAULT ''")
+        self._hashes = _PathHashes(0)
+        self._loaded = False
+
+    def load_hashes(self) -> None:
+        """Fill the path-hash set from the table; later calls are no-ops."""
+        with self._lock:
+            if self._loaded:
+                return
+            (n,) = self._db.execute("SELECT COUNT(*) FROM seen").fetchone()
+            hashes = _PathHashes(n)
+            for (p,) in self._db.execute("SELECT path FROM seen"):
+                hashes.add(_path_hash(p))
+            self._hashes = hashes
+            self._loaded = True
+
+    @staticmethod
+    def _stat(path: str) -> Optional[os.stat_result]:
+        try:
+            return os.stat(path)
+        except OSError:
+            return None
+
+    def contains(self, path: str) -> bool:
+        h = _path_hash(path)
+        with self._lock:
+            if self._loaded and h not in self._hashes:
+                return False
+            row = self._db.execute("SELECT 1 FROM seen WHERE path = ?", (path,)).fetchone()
+        return row is not None
+
+    def add(self, path: str, st: Optional[os.stat_result] = None) -> None:
+        st = st or self._stat(path)
+        if st is None:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO seen VALUES (?, ?, ?, ?, ?, ?)",
+                (path, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, time.time()))
+            self._hashes.add(_path_hash(path))
+
+    def find_moved(self, path: str, st: Optional[os.stat_result] = None) -> Optional[str]:
+        """
+        If *path* is a file already recorded under another path (same device,
+        inode, size and mtime) that no longer exists, re-key the record to
+        *path* and return the old path.  Hard links, whose old path still
+        exists, are not moves.
+        """
+        st = st or self._stat(path)
+        if st is None:
+            return None
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path FROM seen WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?"
+                " AND path != ?",
+                (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, path)).fetchall()
+        for (old,) in rows:
+            if os.path.lexists(old):
+                continue
+            with self._lock:
+                self._db.execute("UPDATE OR REPLACE seen SET path = ?, seen_at = ? WHERE path = ?",
+                                 (path, time.time(), old))
+                self._hashes.discard(_path_hash(old))
+                self._hashes.add(_path_hash(path))
+            return old
+        return None
+
+    def add_many(self, paths: Iterable[str], keep_existing: bool = False) -> int:
+        """
+        Record many files, committing in fixed-size batches.  With
+        *keep_existing*, files already recorded keep their record.  Returns
+        the number of records written.
+        """
+        now   = time.time()
+        rows  = []
+        total = 0
+        for p in paths:
+            st = self._stat(p)
+            if st is None:
+                continue
+            rows.append((p, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, now))
+            if len(rows) >= _BATCH:
+                total += self._insert(rows, keep_existing)
+                rows = []
+        return total + self._insert(rows, keep_existing)
+
+    def _insert(self, rows: list, keep_existing: bool = False) -> int:
+        if not rows:
+            return 0
+        verb = "INSERT OR IGNORE" if keep_existing else "INSERT OR REPLACE"
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(f"{verb} INTO seen VALUES (?, ?, ?, ?, ?, ?)", rows)
+                written = self._db.total_changes - before
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                raise
+            for row in rows:
+                self._hashes.add(_path_hash(row[0]))
+        return written
+
+    def reconcile(self, roots: Iterable[str], stop: Optional[Event] = None) -> int:
+        """
+        Evict records of files that no longer exist.  Only files under one of
+        *roots* are checked (pass the folders that are currently reachable, so
+        an unmounted drive does not wipe its records).  Returns the number evicted.
+        """
+        prefixes = tuple(r.rstrip(os.sep) + os.sep for r in roots)
+        if not prefixes:
+            return 0
+        evicted, last = 0, ""
+        while not (stop is not None and stop.is_set()):
+            with self._lock:
+                paths = [p for (p,) in self._db.execute(
+                    "SELECT path FROM seen WHERE path > ? ORDER BY path LIMIT ?", (last, _BATCH))]
+            if not paths:
+                break
+            last = paths[-1]
+            gone = [p for p in paths if p.startswith(prefixes) and not os.path.lexists(p)]
+            evicted += self._evict(gone)
+        return evicted
+
+    def _evict(self, paths: List[str]) -> int:
+        if not paths:
+            return 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("DELETE FROM seen WHERE path = ?", [(p,) for p in paths])
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                raise
+            for p in paths:
+                self._hashes.discard(_path_hash(p))
+        return len(paths)
+
+    def memory_report(self) -> str:
+        with self._lock:
+            n, nbytes = len(self._hashes), self._hashes.nbytes
+        size = f"{nbytes / 1024:.0f} KiB" if nbytes < 1024 * 1024 else f"{nbytes / 1024 / 1024:.1f} MiB"
+        return f"{n} entries, {size} in memory"
+
+    def primed_scope(self, root: str) -> Optional[Tuple[bool, FrozenSet[str]]]:
+        """(recursive, formats) with which *root*'s existing files were recorded, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT recursive, formats FROM seen_roots WHERE path = ?",
+                                   (root,)).fetchone()
+        if row is None:
+            return None
+        return bool(row[0]), frozenset(f for f in row[1].split(",") if f)
+
+    def mark_primed(self, root: str, recursive: bool, formats: Iterable[str]) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO seen_roots VALUES (?, ?, ?, ?)",
+                             (root, time.time(), int(recursive), ",".join(sorted(formats))))
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
@@ -5,30 +5,114 @@ HTTP and null implementations of ISender.
 """
 
 import json
-import mimetypes
-import os
+from threading import Lock, Thread
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from core.events import ISender
+from services.multipart import MultipartStream
+from services.payload import UploadPayload
+from services.ratelimit import RateLimitedError, RateLimiter
 
 
 class HttpSender(ISender):
+    """
+    Posts files through a pooled keep-alive requests.Session shared by all
+    workers, pacing each webhook with a RateLimiter.  Bodies are streamed
+    with MultipartStream rather than built in memory.
+    """
+
+    def __init__(self, pool_size: int = 10, keep_alive: bool = True,
+                 limiter: Optional[RateLimiter] = None):
+        self._pool_size  = pool_size
+        self._keep_alive = keep_alive
+        self._limiter    = limiter or RateLimiter()
+        self._session: Optional[requests.Session] = None
+        self._lock = Lock()
+
+    def _get_session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self._pool_size,
+                                      pool_maxsize=self._pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://",  adapter)
+                if not self._keep_alive:
+                    session.headers["Connection"] = "close"
+                self._session = session
+            return self._session
+
+    def open(self, urls: Iterable[str], timeout: int,
+             pool_size: Optional[int] = None, keep_alive: Optional[bool] = None) -> None:
+        """Reconfigure the pool and pre-warm one connection per webhook host in the background."""
+        self.close()
+        if pool_size is not None:
+            self._pool_size = max(1, int(pool_size))
+        if keep_alive is not None:
+            self._keep_alive = bool(keep_alive)
+        session = self._get_session()
+        if not self._keep_alive:
+            return
+        hosts = {}
+        for url in urls:
+            parts = urlsplit(url)
+            if parts.scheme in ("http", "https") and parts.netloc:
+                hosts.setdefault((parts.scheme, parts.netloc), url)
+
+        def _warm(url: str) -> None:
+            try:
+                session.head(url, timeout=timeout).close()
+            except requests.exceptions.RequestException:
+                pass
+        for url in hosts.values():
+            Thread(target=_warm, args=(url,), daemon=True).start()
+
+    def close(self) -> None:
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
     def send(self, file_path: str, url: str, timeout: int,
              username: str = "", avatar_url: str = "") -> bool:
-        fname = os.path.basename(file_path)
-        mime, _ = mimetypes.guess_type(file_path)
-        mime = mime or "application/octet-stream"
-        with open(file_path, "rb") as fh:
-            files = {"file": (fname, fh, mime)}
-            if username or avatar_url:
-                payload = {}
-                if username:   payload["username"]   = username
-                if avatar_url: payload["avatar_url"] = avatar_url
-                files["payload_json"] = (None, json.dumps(payload), "application/json")
-            r = requests.post(url, files=files, timeout=timeout)
+        with UploadPayload(file_path) as payload:
+            return self.send_payload(payload, url, timeout, username, avatar_url)
+
+    def send_payload(self, payload: UploadPayload, url: str, timeout: int,
+                     username: str = "", avatar_url: str = "") -> bool:
+        fields = [("file", payload.filename, payload.mime, payload.data)]
+        return self._post(url, fields, timeout, username, avatar_url)
+
+    def send_batch(self, payloads: List[UploadPayload], url: str, timeout: int,
+                   username: str = "", avatar_url: str = "") -> bool:
+        fields = [(f"files[{i}]", p.filename, p.mime, p.data) for i, p in enumerate(payloads)]
+        return self._post(url, fields, timeout, username, avatar_url)
+
+    def _post(self, url: str, fields: list, timeout: int, username: str, avatar_url: str) -> bool:
+        if username or avatar_url:
+            meta = {}
+            if username:   meta["username"]   = username
+            if avatar_url: meta["avatar_url"] = avatar_url
+            fields.append(("payload_json", None, "application/json", json.dumps(meta)))
+        body = MultipartStream(fields)
+        self._limiter.acquire(url)
+        r = self._get_session().post(url, data=body, timeout=timeout,
+                                     headers={"Content-Type": body.content_type})
+        retry_after = self._limiter.update(url, r.status_code, r.headers,
+                                           r.content if r.status_code == 429 else b"")
+        if retry_after is not None:
+            raise RateLimitedError(retry_after)
+        if r.status_code >= 500:
+            r.raise_for_status()
         return r.status_code in (200, 201, 204)
 
+    def throttle_state(self) -> Dict[str, float]:
+        return self._limiter.snapshot()
+
 
 class NullSender(ISender):
     """No-op sender used for testing."""
@@ -0,0 +1,204 @@
+"""
+services/watcher.py
+-------------------
+InotifyWatcher: event-driven folder watching on Linux via ctypes.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+from threading import Lock
+from typing import Dict, List, Set, Tuple
+
+
+# ── inotify constants (linux/inotify.h) ───────────────────────────────────────
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_Q_OVERFLOW  = 0x00004000
+IN_IGNORED     = 0x00008000
+IN_ONLYDIR     = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR       = 0x40000000
+IN_NONBLOCK    = 0x00000800
+IN_CLOEXEC     = 0x00080000
+
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE
+               | IN_ONLYDIR | IN_DONT_FOLLOW)
+_EVENT_HDR  = struct.Struct("iIII")
+_READ_SIZE  = 64 * 1024
+
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes     = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes  = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_LIBC = _load_libc() if os.name == "posix" else None
+
+
+class WatchLimitError(OSError):
+    """Raised when the kernel refuses more watches (fs.inotify.max_user_watches)."""
+
+
+class InotifyWatcher:
+    """
+    Watches folder trees and reports files that were closed after writing or
+    moved in.  Recursive roots get one watch per directory; directories that
+    appear later are watched as soon as their IN_CREATE / IN_MOVED_TO arrives.
+    """
+
+    def __init__(self):
+        if _LIBC is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        fd = _LIBC.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        # Self-pipe that lets another thread cut a blocking read() short
+        self._wake_r, self._wake_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        self._wake_lock = Lock()
+        self._wd_dirs:  Dict[int, str]               = {}
+        self._dir_wds:  Dict[str, int]               = {}
+        self._wd_roots: Dict[int, Tuple[str, bool]]  = {}
+        self.overflowed = False
+        self.degraded:  Set[str] = set()
+
+    @staticmethod
+    def available() -> bool:
+        return _LIBC is not None and hasattr(_LIBC, "inotify_init1")
+
+    # ── Watch management ──────────────────────────────────────────────────────
+
+    def add_tree(self, root: str, recursive: bool) -> None:
+        """Watch *root* (and its subdirectories when *recursive*). Raises WatchLimitError."""
+        root = os.path.abspath(root)
+        self._add_watch(root, root, recursive)
+        if recursive:
+            for dirpath, dirnames, _ in os.walk(root):
+                for d in dirnames:
+                    self._add_watch(os.path.join(dirpath, d), root, recursive)
+
+    def _add_watch(self, path: str, root: str, recursive: bool) -> None:
+        wd = _LIBC.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise WatchLimitError(err, "inotify watch limit reached", path)
+            if err in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                return
+            raise OSError(err, os.strerror(err), path)
+        self._wd_dirs[wd]   = path
+        self._dir_wds[path] = wd
+        self._wd_roots[wd]  = (root, recursive)
+
+    def _forget(self, wd: int) -> None:
+        path = self._wd_dirs.pop(wd, None)
+        self._wd_roots.pop(wd, None)
+        if path is not None and self._dir_wds.get(path) == wd:
+            del self._dir_wds[path]
+
+    def wake(self) -> None:
+        """Make a read() blocked in another thread return early (safe from any thread)."""
+        with self._wake_lock:
+            if self._fd < 0:
+                return
+            try:
+                os.write(self._wake_w, b"\0")
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        with self._wake_lock:
+            if self._fd >= 0:
+                for fd in (self._fd, self._wake_r, self._wake_w):
+                    try:
+                        os.close(fd)
+                    except OSError:
+                        pass
+                self._fd = -1
+        self._wd_dirs.clear()
+        self._dir_wds.clear()
+        self._wd_roots.clear()
+
+    # ── Event reading ─────────────────────────────────────────────────────────
+
+    def read(self, timeout: float) -> List[Tuple[str, str]]:
+        """
+        Block up to *timeout* seconds and return (root, file_path) pairs for
+        files that became available.  Sets ``overflowed`` when the kernel queue
+        dropped events, and adds roots to ``degraded`` when the watch limit was
+        hit while following new subdirectories.
+        """
+        if self._fd < 0:
+            return []
+        try:
+            ready, _, _ = select.select([self._fd, self._wake_r], [], [], max(0.0, timeout))
+        except (OSError, ValueError):
+            return []
+        if self._wake_r in ready:
+            try:
+                os.read(self._wake_r, 4096)
+            except OSError:
+                pass
+        if self._fd not in ready:
+            return []
+        try:
+            buf = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return []
+        out: List[Tuple[str, str]] = []
+        offset = 0
+        while offset + _EVENT_HDR.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT_HDR.unpack_from(buf, offset)
+            offset += _EVENT_HDR.size
+            name = os.fsdecode(buf[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & IN_IGNORED:
+                self._forget(wd)
+                continue
+            parent = self._wd_dirs.get(wd)
+            if parent is None or not name:
+                continue
+            root, recursive = self._wd_roots[wd]
+            path = os.path.join(parent, name)
+            if mask & IN_ISDIR:
+                if recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    out.extend(self._follow_new_dir(path, root))
+                continue
+            if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                out.append((root, path))
+        return out
+
+    def _follow_new_dir(self, path: str, root: str) -> List[Tuple[str, str]]:
+        """Watch a newly created directory tree and report files already inside it."""
+        found: List[Tuple[str, str]] = []
+        try:
+            self._add_watch(path, root, True)
+            for dirpath, dirnames, files in os.walk(path):
+                for d in dirnames:
+                    self._add_watch(os.path.join(dirpath, d), root, True)
+                found.extend((root, os.path.join(dirpath, fn)) for fn in files)
+        except WatchLimitError:
+            self.degraded.add(root)
+        except OSError:
+            pass
+        return found
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._wd_dirs)
@@ -1,6 +1,6 @@
 import os
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, simpledialog
 from typing import Callable
 
 from core.config import C
@@ -21,14 +21,15 @@ class FolderManager(BasePopup):
         b = self.body
         top = tk.Frame(b, bg=C["bg"])
         top.pack(fill="x", side="top")
-        self.panel = TreePanel(top, columns=("on", "rec", "path"),
-                               headings=("On", "Recursive", "Folder Path"),
-                               widths=(44, 80, 440), height=7)
+        self.panel = TreePanel(top, columns=("on", "rec", "scan", "path"),
+                               headings=("On", "Recursive", "Scan / Timeout", "Folder Path"),
+                               widths=(44, 80, 100, 340), height=7)
         self.panel.pack(fill="x")
         act = tk.Frame(top, bg=C["bg"])
         act.pack(fill="x", pady=(4, 0))
         mk_btn(act, "Toggle",           self._toggle,     color=C["bg3"], fg=C["warning"]).pack(side="left", padx=(0, 4))
         mk_btn(act, "Toggle Recursive", self._toggle_rec, color=C["bg3"], fg=C["accent"]).pack(side="left", padx=4)
+        mk_btn(act, "Scan Timing",      self._timing,     color=C["bg3"], fg=C["fg"]).pack(side="left", padx=4)
         mk_btn(act, "Remove",           self._remove,     color=C["bg3"], fg=C["danger"]).pack(side="left", padx=4)
         tk.Frame(b, bg=C["border"], height=1).pack(fill="x", pady=8, side="top")
         bottom = tk.Frame(b, bg=C["bg"])
@@ -53,6 +54,7 @@ class FolderManager(BasePopup):
             self.panel.insert(i, (
                 "✔" if f.get("enabled",   True)  else "—",
                 "✔" if f.get("recursive", False) else "—",
+                f"{f.get('scan_rate') or 'default'} / {f.get('scan_timeout') or 'default'}",
                 f.get("path", ""),
             ))
 
@@ -68,6 +70,23 @@ class FolderManager(BasePopup):
         self.folders[idx]["recursive"] = not self.folders[idx].get("recursive", False)
         self._refresh()
 
+    def _timing(self):
+        idx = self.panel.selected_idx()
+        if idx is None: return
+        f = self.folders[idx]
+        rate = simpledialog.askfloat(
+            "Scan Timing", "Scan this folder every N seconds  (0 = global scan rate):",
+            initialvalue=f.get("scan_rate", 0), minvalue=0, parent=self)
+        if rate is None: return
+        timeout = simpledialog.askfloat(
+            "Scan Timing", "Warn when a scan takes longer than N seconds  (0 = global scan timeout):",
+            initialvalue=f.get("scan_timeout", 0), minvalue=0, parent=self)
+        if timeout is None: return
+        for key, val in (("scan_rate", rate), ("scan_timeout", timeout)):
+            if val: f[key] = val
+            else:   f.pop(key, None)
+        self._refresh()
+
     def _remove(self):
         idx = self.panel.selected_idx()
         if idx is None: return
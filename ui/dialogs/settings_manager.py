@@ -21,14 +21,33 @@ from ui.styles.theme_manager import mk_btn, mk_entry, mk_label, mk_chk
 _BEHAVIOUR_ROWS: List[Tuple[str, str, float]] = [
     ("Scan rate (seconds)",         "scan_rate",    1.0),
     ("Send timeout (seconds)",      "send_timeout", 30),
+    ("Adaptive scan: fastest interval (seconds)", "scan_rate_min", 1.0),
+    ("Adaptive scan: slowest interval (seconds)", "scan_rate_max", 60.0),
+    ("Parallel folder scans",       "scan_workers", 4),
+    ("Scan timeout per folder (seconds)", "scan_timeout", 60.0),
+    ("Scan time budget per pass (seconds, 0 = none)", "scan_budget", 2.0),
     ("File settle delay (seconds)", "file_delay",   0.8),
+    ("Delivery workers",            "delivery_workers", 2),
+    ("Delivery queue size",         "queue_size",   200),
+    ("Per-image deadline (seconds, 0 = none)", "fanout_deadline", 30.0),
+    ("HTTP connections per host",   "http_pool_size", 10),
+    ("Delivery attempts per webhook", "retry_max_attempts", 5),
+    ("Retry base delay (seconds)",  "retry_base_delay", 5.0),
+    ("Batching window (seconds, 0 = off)", "batch_window", 0.0),
+    ("Max files per message",       "batch_max_files", 10),
+    ("Max MB per message",          "batch_max_mb", 25.0),
+    ("Skip duplicates sent within (hours, 0 = off)", "dedup_window", 0.0),
+    ("Prune deleted files from seen index every (hours, 0 = never)", "seen_reconcile_hours", 24.0),
+    ("Failures before circuit opens (0 = off)", "breaker_failures", 5),
+    ("Failure ratio that opens circuit", "breaker_failure_ratio", 0.5),
+    ("Circuit probe interval (seconds)", "breaker_cooldown", 60.0),
 ]
 
 _STATS_ROWS: List[Tuple[str, str, int]] = [
     ("Max send records to keep",                "max_sends",       10000),
     ("Max error records to keep",               "max_errors",       2000),
     ("Months shown in bar chart",               "months",             12),
-    ("Stats autosave every N sends  (0 = never)", "autosave_every",  10),
+    ("Trim stats history every N sends  (0 = on stop)", "autosave_every", 10),
 ]
 
 _COLOR_DEFS: List[Tuple[str, str]] = [
@@ -92,6 +111,36 @@ class SettingsManager(BasePopup):
         self._section(inner, "Behaviour")
         for label, key, default in _BEHAVIOUR_ROWS:
             self._num_row(inner, label, key, default, self._store.values)
+        inotify_row = tk.Frame(inner, bg=C["bg"])
+        inotify_row.pack(fill="x", pady=2)
+        self._vars["use_inotify"] = tk.BooleanVar(
+            value=bool(self._store.values.get("use_inotify", True)))
+        mk_chk(inotify_row, "Watch folders with inotify  (Linux, falls back to polling)",
+               self._vars["use_inotify"], bg=C["bg"]).pack(side="left")
+        adaptive_row = tk.Frame(inner, bg=C["bg"])
+        adaptive_row.pack(fill="x", pady=2)
+        self._vars["adaptive_scan"] = tk.BooleanVar(
+            value=bool(self._store.values.get("adaptive_scan", True)))
+        mk_chk(adaptive_row, "Adapt each folder's scan interval to its activity",
+               self._vars["adaptive_scan"], bg=C["bg"]).pack(side="left")
+        complete_row = tk.Frame(inner, bg=C["bg"])
+        complete_row.pack(fill="x", pady=2)
+        self._vars["check_completeness"] = tk.BooleanVar(
+            value=bool(self._store.values.get("check_completeness", False)))
+        mk_chk(complete_row, "Send files as soon as their image data is complete  (PNG, JPEG, GIF, WebP, BMP)",
+               self._vars["check_completeness"], bg=C["bg"]).pack(side="left")
+        keepalive_row = tk.Frame(inner, bg=C["bg"])
+        keepalive_row.pack(fill="x", pady=2)
+        self._vars["http_keep_alive"] = tk.BooleanVar(
+            value=bool(self._store.values.get("http_keep_alive", True)))
+        mk_chk(keepalive_row, "Reuse HTTP connections  (keep-alive, pre-warmed on start)",
+               self._vars["http_keep_alive"], bg=C["bg"]).pack(side="left")
+        drain_row = tk.Frame(inner, bg=C["bg"])
+        drain_row.pack(fill="x", pady=2)
+        self._vars["drain_on_stop"] = tk.BooleanVar(
+            value=bool(self._store.values.get("drain_on_stop", False)))
+        mk_chk(drain_row, "Finish queued deliveries when monitoring stops",
+               self._vars["drain_on_stop"], bg=C["bg"]).pack(side="left")
         tk.Frame(inner, bg=C["bg"], height=6).pack()
 
         # ── File types ──
@@ -424,11 +473,17 @@ class SettingsManager(BasePopup):
     # ── Save ──────────────────────────────────────────────────────────────────
 
     def _save(self):
-        for key in ("scan_rate", "send_timeout", "file_delay"):
+        for _, key, _ in _BEHAVIOUR_ROWS:
             try:
-                self._store.values[key] = float(self._vars[key].get())
+                val = float(self._vars[key].get())
+                self._store.values[key] = int(val) if isinstance(DEFAULTS[key], int) else val
             except ValueError:
                 self._store.values[key] = DEFAULTS[key]
+        self._store.values["use_inotify"]   = bool(self._vars["use_inotify"].get())
+        self._store.values["check_completeness"] = bool(self._vars["check_completeness"].get())
+        self._store.values["adaptive_scan"] = bool(self._vars["adaptive_scan"].get())
+        self._store.values["drain_on_stop"] = bool(self._vars["drain_on_stop"].get())
+        self._store.values["http_keep_alive"] = bool(self._vars["http_keep_alive"].get())
         self._store.values["formats"]       = self._vars["formats"].get().strip()
         self._store.values["sound_enabled"] = bool(self._vars["sound_enabled"].get())
         try:
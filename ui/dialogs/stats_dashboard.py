@@ -8,7 +8,7 @@ import os
 import tkinter as tk
 from tkinter import messagebox, ttk
 
-from core.config import C, StatisticsStore
+from core.config import C, THROUGHPUT_VIEWS, StatisticsStore
 from ui.components.charts import BarChart, PieChart
 from ui.components.factory import BasePopup
 from ui.components.tree_panel import TreePanel
@@ -20,6 +20,8 @@ class StatsWindow(BasePopup):
         super().__init__(parent, "Statistics", "Send history & analytics", size="860x640")
         self.resizable(True, True)
         self._stats = stats
+        # Show what has been recorded up to now, including events still queued
+        self._stats.flush(1.0)
         self._build()
 
     def _build(self):
@@ -34,12 +36,13 @@ class StatsWindow(BasePopup):
                   background=[("selected", C["bg2"])],
                   foreground=[("selected", C["accent"])])
 
-        tab_names = ["Overview", "Webhooks", "Folders", "Errors", "Recent"]
+        tab_names = ["Overview", "Throughput", "Webhooks", "Folders", "Errors", "Recent"]
         self._tabs = {n: tk.Frame(nb, bg=C["bg"]) for n in tab_names}
         for name, frame in self._tabs.items():
             nb.add(frame, text=f"  {name}  ")
 
         self._build_overview()
+        self._build_throughput()
         self._build_webhooks()
         self._build_folders()
         self._build_errors()
@@ -61,9 +64,7 @@ class StatsWindow(BasePopup):
         p = self._tabs["Overview"]
         summary = tk.Frame(p, bg=C["bg2"], pady=8)
         summary.pack(fill="x", padx=8, pady=(8, 4))
-        sends  = self._stats.sends
-        total  = len(sends)
-        ok     = sum(1 for s in sends if s.get("ok"))
+        total, ok, errors = self._stats.totals()
         fail   = total - ok
         rate   = f"{100 * ok / total:.1f}%" if total else "—"
         for val, lbl, col in [
@@ -71,7 +72,7 @@ class StatsWindow(BasePopup):
             (str(ok),    "Successful",   C["accent2"]),
             (str(fail),  "Failed",       C["danger"]),
             (rate,       "Success Rate", C["warning"]),
-            (str(len(self._stats.errors)), "Errors", C["fg2"]),
+            (str(errors), "Errors",       C["fg2"]),
         ]:
             f = tk.Frame(summary, bg=C["bg2"])
             f.pack(side="left", padx=18)
@@ -95,6 +96,28 @@ class StatsWindow(BasePopup):
                                  bg=C["bg2"], height=150)
         self._ext_pie.pack(fill="x")
 
+    def _build_throughput(self):
+        p   = self._tabs["Throughput"]
+        bar = tk.Frame(p, bg=C["bg"])
+        bar.pack(fill="x", padx=8, pady=(10, 2))
+        mk_label(bar, "Images Sent —", fg=C["fg2"],
+                 font=("Segoe UI", 9, "bold")).pack(side="left")
+        self._throughput_view = tk.StringVar(value="24 h")
+        for view in THROUGHPUT_VIEWS:
+            tk.Radiobutton(bar, text=view, value=view, variable=self._throughput_view,
+                           command=self._populate_throughput, indicatoron=False,
+                           bg=C["bg3"], fg=C["fg2"], selectcolor=C["bg2"],
+                           activebackground=C["bg2"], activeforeground=C["accent"],
+                           relief="flat", bd=0, padx=10, pady=3,
+                           font=("Segoe UI", 8), cursor="hand2").pack(side="left", padx=(6, 0))
+        self._throughput_chart = BarChart(p, data=[], color=C["accent"], bg=C["bg2"])
+        self._throughput_chart.pack(fill="both", expand=True, padx=8, pady=(4, 8))
+        self._populate_throughput()
+
+    def _populate_throughput(self):
+        self._throughput_chart.update_data(
+            self._stats.throughput(self._throughput_view.get()))
+
     def _build_webhooks(self):
         p = self._tabs["Webhooks"]
         mk_label(p, "Images Sent per Webhook", fg=C["fg2"],
@@ -115,8 +138,9 @@ class StatsWindow(BasePopup):
         p = self._tabs["Folders"]
         mk_label(p, "Images Sent per Folder", fg=C["fg2"],
                  font=("Segoe UI", 9, "bold")).pack(anchor="w", padx=10, pady=(10, 2))
+        folders = self._stats.folder_data()
         self._folder_bar = BarChart(p,
-            data=[(os.path.basename(l) or l, v) for l, v in self._stats.folder_data()],
+            data=[(os.path.basename(l) or l, v) for l, v in folders],
             color=C["warning"], bg=C["bg2"], height=200)
         self._folder_bar.pack(fill="x", padx=8, pady=4)
         mk_label(p, "Folder Detail", fg=C["fg2"],
@@ -126,7 +150,7 @@ class StatsWindow(BasePopup):
             headings=("Folder Path", "Images Sent"),
             widths=(480, 100), height=8)
         self._folder_tree.pack(fill="both", expand=True, padx=8, pady=4)
-        self._repopulate(self._folder_tree, self._stats.folder_data())
+        self._repopulate(self._folder_tree, folders)
 
     def _build_errors(self):
         p = self._tabs["Errors"]
@@ -134,10 +158,11 @@ class StatsWindow(BasePopup):
                  font=("Segoe UI", 9, "bold")).pack(anchor="w", padx=10, pady=(10, 2))
         err_row = tk.Frame(p, bg=C["bg"])
         err_row.pack(fill="x", padx=8, pady=4)
-        self._error_pie = PieChart(err_row, data=self._stats.error_type_data(),
+        err_types = self._stats.error_type_data()
+        self._error_pie = PieChart(err_row, data=err_types,
                                    bg=C["bg2"], height=200)
         self._error_pie.pack(side="left", fill="both", expand=True)
-        self._error_bar = BarChart(err_row, data=self._stats.error_type_data(),
+        self._error_bar = BarChart(err_row, data=err_types,
                                    color=C["danger"], bg=C["bg2"], height=200)
         self._error_bar.pack(side="left", fill="both", expand=True)
         mk_label(p, "Recent Errors", fg=C["fg2"],
@@ -147,10 +172,9 @@ class StatsWindow(BasePopup):
             headings=("Time", "Type", "File", "Webhook", "Detail"),
             widths=(80, 100, 160, 120, 220), height=8)
         self._error_tree.pack(fill="both", expand=True, padx=8, pady=4)
-        errors = list(reversed(self._stats.errors[-200:]))
+        errors = self._stats.recent_errors(200)
         self._repopulate(self._error_tree, [
-            (e.get("time",""), e.get("type",""), e.get("file",""),
-             e.get("webhook",""), e.get("detail",""))
+            (e.time, e.type, e.file, e.webhook, e.detail)
             for e in errors
         ])
 
@@ -158,8 +182,8 @@ class StatsWindow(BasePopup):
         p    = self._tabs["Recent"]
         hdr  = tk.Frame(p, bg=C["bg"])
         hdr.pack(fill="x", padx=8, pady=(10, 2))
-        ok   = sum(1 for s in self._stats.sends if s.get("ok"))
-        fail = len(self._stats.sends) - ok
+        total, ok, _ = self._stats.totals()
+        fail = total - ok
         mk_label(hdr, "Recent Sends (latest 500)", fg=C["fg2"],
                  font=("Segoe UI", 9, "bold")).pack(side="left")
         mk_label(hdr, f"  {ok} ok  |  {fail} failed", fg=C["fg2"],
@@ -172,29 +196,30 @@ class StatsWindow(BasePopup):
         self._populate_recent()
 
     def _populate_recent(self):
-        recent = list(reversed(self._stats.sends[-500:]))
+        recent = self._stats.recent_sends(500)
         self._repopulate(self._recent_tree, [
-            (s.get("time",""), s.get("file",""), s.get("webhook",""),
-             os.path.basename(s.get("folder","")) or s.get("folder",""),
-             s.get("ext",""), "✓ OK" if s.get("ok") else "✗ Fail")
+            (s.time, s.file, s.webhook, os.path.basename(s.folder) or s.folder,
+             s.ext, "✓ OK" if s.ok else "✗ Fail")
             for s in recent
         ])
 
     def _refresh_all(self):
+        self._stats.flush(1.0)
         n = self._stats._config.get("months", 12)
         self._monthly_chart.update_data(self._stats.months_data(n))
         self._ext_pie.update_data(self._stats.ext_data())
+        self._populate_throughput()
         self._webhook_bar.update_data(self._stats.webhook_data())
         self._repopulate(self._webhook_tree, self._stats.webhook_table())
-        self._folder_bar.update_data(
-            [(os.path.basename(l) or l, v) for l, v in self._stats.folder_data()])
-        self._repopulate(self._folder_tree, self._stats.folder_data())
-        self._error_pie.update_data(self._stats.error_type_data())
-        self._error_bar.update_data(self._stats.error_type_data())
-        errors = list(reversed(self._stats.errors[-200:]))
+        folders = self._stats.folder_data()
+        self._folder_bar.update_data([(os.path.basename(l) or l, v) for l, v in folders])
+        self._repopulate(self._folder_tree, folders)
+        err_types = self._stats.error_type_data()
+        self._error_pie.update_data(err_types)
+        self._error_bar.update_data(err_types)
+        errors = self._stats.recent_errors(200)
         self._repopulate(self._error_tree, [
-            (e.get("time",""), e.get("type",""), e.get("file",""),
-             e.get("webhook",""), e.get("detail",""))
+            (e.time, e.type, e.file, e.webhook, e.detail)
             for e in errors
         ])
         self._populate_recent()
@@ -7,8 +7,7 @@ WIS: the root application window and main controller.
 import os
 import time
 import tkinter as tk
-from threading import Thread
-from typing import Callable
+from typing import Callable, Optional
 
 from core.config import C, DEFAULTS, _LOG_ICONS, SettingsStore, StatisticsStore
 from core.events import ISender, IAudioPlayer
@@ -27,10 +26,12 @@ class WIS:
                  sender: ISender,
                  audio:  IAudioPlayer,
                  store:  SettingsStore,
-                 stats:  StatisticsStore):
+                 stats:  StatisticsStore,
+                 state_path: str = ""):
         self.root   = root
         self._store = store
         self._stats = stats
+        self._sender = sender
 
         self.root.title("WIS — Webhook Image Sender")
         self.root.minsize(720, 540)
@@ -38,11 +39,13 @@ class WIS:
 
         self._auto_start_var = tk.BooleanVar(value=store.auto_start)
         self._debug_var      = tk.BooleanVar(value=store.debug_mode)
+        self._status_after: Optional[str] = None
 
         self._monitoring = MonitoringService(
             sender=sender, audio=audio, stats=stats,
             on_log=self._log_from_thread,
             on_counters=self._update_counters,
+            state_path=state_path,
         )
 
         C.update({k: store.values[k] for k in DEFAULTS if k in store.values})
@@ -164,12 +167,36 @@ class WIS:
         )
 
     def _webhook_summary(self) -> str:
+        running  = self._monitoring.running
+        throttle = self._sender.throttle_state() if running else {}
+        circuits = self._monitoring.breaker_state() if running else {}
+
+        def _label(w: dict) -> str:
+            url  = w.get("url", "")
+            text = f"• {w.get('name', 'Unnamed')}"
+            if url in circuits:
+                state, wait = circuits[url]
+                return text + (f"  (circuit open, probe in {wait:.0f}s)" if wait else f"  ({state})")
+            wait = throttle.get(url)
+            return text + (f"  (throttled {wait:.0f}s)" if wait else "")
         return self._summary(
             self._store.webhooks,
             "No webhooks configured", "All webhooks disabled",
-            lambda w: f"• {w.get('name', 'Unnamed')}",
+            _label,
         )
 
+    def _poll_webhook_status(self):
+        # A single poller at a time, however quickly monitoring is restarted
+        self._cancel_webhook_poll()
+        self._webhook_lbl.config(text=self._webhook_summary())
+        if self._monitoring.running:
+            self._status_after = self.root.after(1000, self._poll_webhook_status)
+
+    def _cancel_webhook_poll(self):
+        if self._status_after is not None:
+            self.root.after_cancel(self._status_after)
+            self._status_after = None
+
     def _refresh_pill_stats(self):
         self._s_hooks.config(
             text=str(sum(1 for w in self._store.webhooks if w.get("enabled", True))))
@@ -273,13 +300,16 @@ class WIS:
         self._status_pill.config(text="  MONITORING  ", bg="#1a3320", fg=C["accent2"])
 
         self._monitoring.start(valid, resolved_webhooks, self._store.values, self._store.debug_mode)
+        self._poll_webhook_status()
         names = ", ".join(w["name"] for w in resolved_webhooks)
         self.log(f"Started — {len(valid)} folder(s) → {len(resolved_webhooks)} webhook(s): {names}", "ok")
 
     def stop_monitoring(self):
         self._monitoring.stop()
+        self._cancel_webhook_poll()
+        self._webhook_lbl.config(text=self._webhook_summary())
         self._start_btn.config(state="normal")
         self._stop_btn.config(state="disabled")
         self._status_pill.config(text="  STOPPED  ", bg="#2a1a1a", fg=C["danger"])
         self.log("Monitoring stopped", "warn")
-        Thread(target=self._stats.save, daemon=True).start()
+        self._stats.save()